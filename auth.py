@@ -2,31 +2,100 @@
 
 from __future__ import annotations
 
+import functools
+import os
+import re
+import shutil
 import subprocess
+import sys
+import threading
+import time
 import webbrowser
 from pathlib import Path
 
 ENV_FILE = Path(__file__).parent / ".env"
+# Parsed-value cache written by earlier versions; it held every token in plain text
+_LEGACY_ENV_CACHE_FILE = Path(__file__).parent / ".env.cache.json"
 
 REQUIRED_KEYS = ("OPENAI_API_KEY", "JIRA_API_TOKEN", "GITHUB_TOKEN")
 
+_BANNER = "=" * 55
+
+# One ``KEY=value`` assignment per line; comment lines never match the key group.
+_ENV_RE = re.compile(r"^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(.*?)[ \t\r]*$", re.MULTILINE)
+# Same assignment as seen by write_env(), which also accepts an ``export`` prefix
+_ENV_LINE_RE = re.compile(r"^([ \t]*(?:export[ \t]+)?)([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(.*?)[ \t\r\n]*$")
+# Values written without quotes; anything else is single-quoted like dotenv's set_key
+_PLAIN_VALUE_RE = re.compile(r"[A-Za-z0-9_.,:/@+=%~^-]*")
+
 
 def read_env() -> dict[str, str]:
     """Read key=value pairs from the .env file."""
-    values: dict[str, str] = {}
-    if ENV_FILE.exists():
-        for line in ENV_FILE.read_text().splitlines():
-            line = line.strip()
-            if line and not line.startswith("#") and "=" in line:
-                key, _, val = line.partition("=")
-                values[key.strip()] = val.strip()
-    return values
+    try:
+        return dict(_ENV_RE.findall(ENV_FILE.read_text()))
+    except FileNotFoundError:
+        return {}
+
+
+def _quote_env_value(value: str) -> str:
+    if _PLAIN_VALUE_RE.fullmatch(value):
+        return value
+    return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
 
 
 def write_env(values: dict[str, str]) -> None:
-    """Write key=value pairs to the .env file."""
-    lines = [f"{k}={v}" for k, v in values.items()]
-    ENV_FILE.write_text("\n".join(lines) + "\n")
+    """Set the given keys in the .env file, replacing it atomically.
+
+    Only the assignments of these keys are rewritten (in place, keeping an
+    ``export`` prefix); keys not yet in the file are appended. Comments,
+    blank lines, other keys and multi-line quoted values are copied through,
+    and a line whose raw value already equals the new one is left untouched,
+    so passing back a read_env() dict does not re-quote anything.
+    The file keeps its permissions (0600 when it is created): it holds tokens.
+    """
+    try:
+        lines = ENV_FILE.read_text().splitlines(keepends=True)
+        mode = ENV_FILE.stat().st_mode & 0o777
+    except FileNotFoundError:
+        lines = []
+        mode = 0o600
+    out: list[str] = []
+    seen: set[str] = set()
+    i = 0
+    while i < len(lines):
+        m = _ENV_LINE_RE.match(lines[i])
+        end = i + 1
+        if m:
+            raw = m.group(3)
+            quote = raw[:1]
+            if quote in ("'", '"') and quote not in raw[1:]:
+                # Multi-line value: runs to the next line holding the closing
+                # quote; without one it is just a stray quote on this line.
+                close = next((j for j in range(i + 1, len(lines)) if quote in lines[j]), None)
+                if close is not None:
+                    end = close + 1
+        if m and m.group(2) in values:
+            prefix, key, raw = m.groups()
+            seen.add(key)
+            if raw == values[key]:
+                out.extend(lines[i:end])
+            else:
+                out.append(f"{prefix}{key}={_quote_env_value(values[key])}\n")
+        else:
+            out.extend(lines[i:end])
+        i = end
+    if out and not out[-1].endswith("\n"):
+        out[-1] += "\n"
+    out.extend(f"{k}={_quote_env_value(v)}\n" for k, v in values.items() if k not in seen)
+
+    tmp = ENV_FILE.with_name(ENV_FILE.name + ".tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+    with os.fdopen(fd, "w") as f:
+        f.writelines(out)
+    # O_CREAT ignores the mode for a tmp file left over from an earlier run
+    os.chmod(tmp, mode)
+    os.replace(tmp, ENV_FILE)
+    _LEGACY_ENV_CACHE_FILE.unlink(missing_ok=True)
 
 
 def ensure_credentials() -> bool:
@@ -34,6 +103,10 @@ def ensure_credentials() -> bool:
 
     Returns True when all required credentials are present.
     """
+    # Fast path: everything already exported, no need to touch .env
+    if all(os.environ.get(k) for k in REQUIRED_KEYS):
+        return True
+
     env = read_env()
     missing = [k for k in REQUIRED_KEYS if not env.get(k)]
 
@@ -59,10 +132,13 @@ def ensure_credentials() -> bool:
 # ---- Individual setup helpers ------------------------------------------------
 
 
+def open_browser(url: str) -> None:
+    """Open *url* in the default browser on a daemon thread, without blocking the prompt."""
+    threading.Thread(target=webbrowser.open, args=(url,), daemon=True).start()
+
+
 def _setup_openai(env: dict[str, str]) -> None:
-    print("=" * 55)
-    print("  OPENAI API KEY")
-    print("=" * 55)
+    sys.stdout.write(f"{_BANNER}\n  OPENAI API KEY\n{_BANNER}\n")
     print("  Get your key at: https://platform.openai.com/api-keys")
     print()
     key = input("  Paste your OpenAI API key: ").strip()
@@ -70,10 +146,7 @@ def _setup_openai(env: dict[str, str]) -> None:
 
 
 def _setup_jira(env: dict[str, str]) -> None:
-    print()
-    print("=" * 55)
-    print("  JIRA API TOKEN  (SSO — browser will open)")
-    print("=" * 55)
+    sys.stdout.write(f"\n{_BANNER}\n  JIRA API TOKEN  (SSO — browser will open)\n{_BANNER}\n")
     print()
     print("  1. Your browser will open the Atlassian token page")
     print("  2. Sign in with SSO if prompted")
@@ -82,17 +155,14 @@ def _setup_jira(env: dict[str, str]) -> None:
     print("  5. Copy the token")
     print()
     input("  Press Enter to open the browser...")
-    webbrowser.open("https://id.atlassian.com/manage-profile/security/api-tokens")
+    open_browser("https://id.atlassian.com/manage-profile/security/api-tokens")
     print()
     token = input("  Paste your Jira API token: ").strip()
     env["JIRA_API_TOKEN"] = token
 
 
 def _setup_github(env: dict[str, str]) -> None:
-    print()
-    print("=" * 55)
-    print("  GITHUB TOKEN  (SSO — browser will open)")
-    print("=" * 55)
+    sys.stdout.write(f"\n{_BANNER}\n  GITHUB TOKEN  (SSO — browser will open)\n{_BANNER}\n")
 
     # Try the gh CLI first — it already handles SSO via the browser
     token = _try_gh_cli()
@@ -109,7 +179,7 @@ def _setup_github(env: dict[str, str]) -> None:
     print("  5. Click 'Generate token' and copy it")
     print()
     input("  Press Enter to open the browser...")
-    webbrowser.open(
+    open_browser(
         "https://github.com/settings/tokens/new?scopes=repo&description=MCP+Dev+Pipeline"
     )
     print()
@@ -117,17 +187,29 @@ def _setup_github(env: dict[str, str]) -> None:
     env["GITHUB_TOKEN"] = token
 
 
+@functools.lru_cache(maxsize=1)
 def _try_gh_cli() -> str | None:
     """Return a token from the gh CLI if it is installed and authenticated."""
-    try:
-        result = subprocess.run(
-            ["gh", "auth", "token"],
-            capture_output=True,
-            text=True,
-            timeout=5,
-        )
+    gh = shutil.which("gh")
+    if gh is None:
+        return None
+    # Two short attempts with a backoff pause; worst case stays around 3s.
+    for attempt in range(2):
+        try:
+            result = subprocess.run(
+                [gh, "auth", "token"],
+                capture_output=True,
+                text=True,
+                timeout=1.25,
+            )
+        except FileNotFoundError:
+            return None
+        except subprocess.TimeoutExpired:
+            if attempt == 1:
+                return None
+            time.sleep(0.5 * 2 ** attempt)
+            continue
         if result.returncode == 0 and result.stdout.strip():
             return result.stdout.strip()
-    except (FileNotFoundError, subprocess.TimeoutExpired):
-        pass
+        return None
     return None
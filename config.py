@@ -1,31 +1,75 @@
+import functools
 import os
-from dataclasses import dataclass, field
-from dotenv import load_dotenv
 
-load_dotenv()
+
+@functools.cache
+def _load_dotenv() -> None:
+    """Load .env into the process environment once, on first config access."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
 
 
-@dataclass
 class Config:
-    OPENAI_API_KEY: str = field(default_factory=lambda: os.getenv("OPENAI_API_KEY", ""))
+    """Read-only settings, each resolved from the environment on first access."""
+
+    _DEFAULTS = {
+        "OPENAI_API_KEY": "",
+        "DEVELOPER_MODEL": "gpt-4o-mini",
+        "ARCHITECT_MODEL": "gpt-4o",
+        "PM_MODEL": "gpt-4o-mini",
+        "JIRA_URL": "",
+        "JIRA_USER": "",
+        "JIRA_API_TOKEN": "",
+        "JIRA_PROJECT_KEY": "",
+        "GITHUB_TOKEN": "",
+        "GITHUB_REPO": "",
+        "BASE_BRANCH": "dev",
+    }
+    __slots__ = tuple(_DEFAULTS)
+
+    OPENAI_API_KEY: str
+
+    DEVELOPER_MODEL: str
+    ARCHITECT_MODEL: str
+    PM_MODEL: str
+
+    JIRA_URL: str
+    JIRA_USER: str
+    JIRA_API_TOKEN: str
+    JIRA_PROJECT_KEY: str
+
+    GITHUB_TOKEN: str
+    GITHUB_REPO: str
+    BASE_BRANCH: str
 
-    DEVELOPER_MODEL: str = field(default_factory=lambda: os.getenv("DEVELOPER_MODEL", "gpt-4o-mini"))
-    ARCHITECT_MODEL: str = field(default_factory=lambda: os.getenv("ARCHITECT_MODEL", "gpt-4o"))
-    PM_MODEL: str = field(default_factory=lambda: os.getenv("PM_MODEL", "gpt-4o-mini"))
+    def __getattr__(self, name: str) -> str:
+        # Only called while the slot is still empty; memoize into it.
+        try:
+            default = self._DEFAULTS[name]
+        except KeyError:
+            raise AttributeError(name) from None
+        value = os.environ.get(name, default)
+        object.__setattr__(self, name, value)
+        return value
 
-    JIRA_URL: str = field(default_factory=lambda: os.getenv("JIRA_URL", ""))
-    JIRA_USER: str = field(default_factory=lambda: os.getenv("JIRA_USER", ""))
-    JIRA_API_TOKEN: str = field(default_factory=lambda: os.getenv("JIRA_API_TOKEN", ""))
-    JIRA_PROJECT_KEY: str = field(default_factory=lambda: os.getenv("JIRA_PROJECT_KEY", ""))
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError(f"Config is read-only (cannot set {name!r})")
 
-    GITHUB_TOKEN: str = field(default_factory=lambda: os.getenv("GITHUB_TOKEN", ""))
-    GITHUB_REPO: str = field(default_factory=lambda: os.getenv("GITHUB_REPO", ""))
-    BASE_BRANCH: str = field(default_factory=lambda: os.getenv("BASE_BRANCH", "dev"))
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._DEFAULTS)
+        return f"Config({fields})"
 
 
+@functools.lru_cache(maxsize=1)
 def get_config() -> Config:
-    """Create a fresh Config reading current environment variables."""
+    """Return the process-wide Config, built from the environment on first call."""
+    _load_dotenv()
     return Config()
 
 
-config = Config()
+def __getattr__(name: str) -> Config:
+    # Keeps ``from config import config`` working without building Config at import.
+    if name == "config":
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
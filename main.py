@@ -3,19 +3,31 @@
 
 Usage:
     python main.py
+    python main.py --help
 """
 
-import getpass
+import functools
 import os
-import subprocess
+import re
 import sys
-import webbrowser
+
+_ENV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
+
+# Cheap local shape checks so an obviously broken token never costs a network round-trip.
+# GitHub: classic/OAuth/app tokens (gh*_), fine-grained PATs, and legacy 40-hex tokens.
+_GH_TOKEN_RE = re.compile(r"^(gh[pousr]_[A-Za-z0-9]{36,}|github_pat_[A-Za-z0-9_]{22,}|[0-9a-f]{40})$")
+_JIRA_TOKEN_RE = re.compile(r"^[A-Za-z0-9_=+/-]{24,}$")
+
+_BANNER = "=" * 58
+_RULE = "  " + "-" * 40
 
 
 def prompt(label: str, default: str = "", secret: bool = False) -> str:
     suffix = f" [{default}]" if default else ""
     text = f"  {label}{suffix}: "
     if secret:
+        import getpass
+
         value = getpass.getpass(text).strip()
     else:
         value = input(text).strip()
@@ -24,16 +36,15 @@ def prompt(label: str, default: str = "", secret: bool = False) -> str:
 
 def _obtain_github_token(try_cli: bool = True) -> str:
     """Get GitHub token: try gh CLI first (unless try_cli=False), then open browser for PAT creation."""
+    from auth import open_browser
+
     if try_cli:
-        try:
-            result = subprocess.run(
-                ["gh", "auth", "token"], capture_output=True, text=True, timeout=5
-            )
-            if result.returncode == 0 and result.stdout.strip():
-                print("  Found token from GitHub CLI (gh).")
-                return result.stdout.strip()
-        except (FileNotFoundError, subprocess.TimeoutExpired):
-            pass
+        from auth import _try_gh_cli
+
+        token = _try_gh_cli()
+        if token:
+            print("  Found token from GitHub CLI (gh).")
+            return token
 
     print()
     print("  Opening browser for GitHub PAT creation...")
@@ -42,7 +53,7 @@ def _obtain_github_token(try_cli: bool = True) -> str:
     print("  3. Under scopes, check 'repo' (full control)")
     print("  4. Click 'Generate token', copy it, then come back here and paste it below")
     print()
-    webbrowser.open(
+    open_browser(
         "https://github.com/settings/tokens/new?scopes=repo&description=MCP+Dev+Pipeline"
     )
     print()
@@ -51,6 +62,8 @@ def _obtain_github_token(try_cli: bool = True) -> str:
 
 def _obtain_jira_token() -> str:
     """Open browser for Jira API token creation via SSO."""
+    from auth import open_browser
+
     print()
     print("  Opening browser for Jira API token creation...")
     print("  1. Sign in with SSO if prompted")
@@ -58,27 +71,41 @@ def _obtain_jira_token() -> str:
     print("  3. Name it (e.g. 'MCP Pipeline') and click Create")
     print("  4. Copy the token, then come back here and paste it below")
     print()
-    webbrowser.open("https://id.atlassian.com/manage-profile/security/api-tokens")
+    open_browser("https://id.atlassian.com/manage-profile/security/api-tokens")
     print()
     return input("  Paste your Jira API token: ").strip()
 
 
 def _obtain_openai_key() -> str:
     """Get OpenAI API key."""
+    import getpass
+
+    from auth import open_browser
+
     print()
     print("  Opening browser for OpenAI API key creation...")
     print("  Copy the key, then come back here and paste it below")
     print()
-    webbrowser.open("https://platform.openai.com/api-keys")
+    open_browser("https://platform.openai.com/api-keys")
     print()
     return getpass.getpass("  Paste your OpenAI API key: ").strip()
 
 
+@functools.cache
+def _session():
+    """Shared requests.Session so repeated credential checks reuse the TLS connection."""
+    import requests
+
+    return requests.Session()
+
+
 def _validate_jira(url: str, user: str, token: str) -> bool:
     """Return True if the Jira credentials work."""
+    if not _JIRA_TOKEN_RE.match(token):
+        print("  Jira API token looks malformed (empty, too short, or contains spaces).")
+        return False
     try:
-        import requests
-        r = requests.get(f"{url}/rest/api/2/myself", auth=(user, token), timeout=10)
+        r = _session().get(f"{url}/rest/api/2/myself", auth=(user, token), timeout=5)
         if r.status_code == 200:
             return True
         seraph = r.headers.get("X-Seraph-Loginreason", "")
@@ -99,32 +126,49 @@ def _validate_jira(url: str, user: str, token: str) -> bool:
 
 def _validate_github(token: str, repo: str) -> bool:
     """Return True if the GitHub token and repo are accessible."""
+    if not _GH_TOKEN_RE.match(token):
+        print("  GitHub token looks malformed (empty, wrong prefix, or contains spaces).")
+        return False
     try:
-        from github import Github
-        g = Github(token)
-        g.get_repo(repo)
-        return True
+        r = _session().get(
+            f"https://api.github.com/repos/{repo}",
+            headers={"Authorization": f"Bearer {token}", "Accept": "application/vnd.github+json"},
+            timeout=5,
+        )
+        if r.status_code == 200:
+            return True
+        print(f"  GitHub authentication failed: HTTP {r.status_code} — {r.text[:120]}")
+        return False
     except Exception as e:
-        print(f"  GitHub authentication failed: {e}")
+        print(f"  GitHub connection error: {e}")
         return False
 
 
+def _validate_all(
+    jira_url: str, jira_user: str, jira_token: str, github_token: str, github_repo: str,
+) -> tuple[bool, bool]:
+    """Probe Jira and GitHub concurrently; return (jira_ok, github_ok)."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        jira = pool.submit(_validate_jira, jira_url, jira_user, jira_token)
+        github = pool.submit(_validate_github, github_token, github_repo)
+        return jira.result(), github.result()
+
+
 def _ensure_jira_token(url: str, user: str, token: str, env_path: str) -> str:
-    """Validate the Jira token; re-prompt on simple auth failure, warn and continue on org-policy block."""
+    """Recover from a failed Jira check; re-prompt on simple auth failure, warn and continue on org-policy block."""
     from dotenv import set_key
 
-    print(f"  Checking Jira connection...")
-    if _validate_jira(url, user, token):
-        print("  Jira connection OK.")
-        return token
-
     # If the header shows AUTHENTICATED_FAILED it's an org policy issue — no point retrying with new tokens.
-    import requests
-    try:
-        r = requests.get(f"{url}/rest/api/2/myself", auth=(user, token), timeout=10)
-        org_policy_block = r.headers.get("X-Seraph-Loginreason") == "AUTHENTICATED_FAILED"
-    except Exception:
-        org_policy_block = False
+    # A malformed token was rejected locally, so skip the probe and go straight to re-prompting.
+    org_policy_block = False
+    if _JIRA_TOKEN_RE.match(token):
+        try:
+            r = _session().get(f"{url}/rest/api/2/myself", auth=(user, token), timeout=5)
+            org_policy_block = r.headers.get("X-Seraph-Loginreason") == "AUTHENTICATED_FAILED"
+        except Exception:
+            pass
 
     if org_policy_block:
         print()
@@ -159,42 +203,38 @@ def _ensure_jira_token(url: str, user: str, token: str, env_path: str) -> str:
 
 
 def _ensure_github_token(token: str, repo: str, env_path: str) -> str:
-    """Validate the GitHub token, re-prompting with browser popup if invalid."""
+    """Recover from a failed GitHub check, re-prompting with browser popup until the token works."""
     from dotenv import set_key
     max_attempts = 3
-    for attempt in range(1, max_attempts + 1):
-        print(f"  Checking GitHub connection... (attempt {attempt}/{max_attempts})")
-        if _validate_github(token, repo):
-            print("  GitHub connection OK.")
-            return token
+    # Attempt 1 is the concurrent probe in main()
+    for attempt in range(2, max_attempts + 1):
         print()
         print("  GitHub credentials are invalid. Opening browser to create a new token...")
         set_key(env_path, "GITHUB_TOKEN", "")
         os.environ.pop("GITHUB_TOKEN", None)
         # Skip gh CLI on retries — it would return the same bad token
         token = _obtain_github_token(try_cli=False)
+        print(f"  Checking GitHub connection... (attempt {attempt}/{max_attempts})")
+        if _validate_github(token, repo):
+            print("  GitHub connection OK.")
+            return token
     print("  ERROR: Could not authenticate with GitHub after multiple attempts. Exiting.")
     sys.exit(1)
 
 
 def main() -> None:
-    print()
-    print("=" * 58)
-    print("    Multi-Agent Development Pipeline")
-    print("=" * 58)
-    print()
+    sys.stdout.write(f"\n{_BANNER}\n    Multi-Agent Development Pipeline\n{_BANNER}\n\n")
 
-    env_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
-    if not os.path.exists(env_path):
-        open(env_path, "w").close()
+    env_path = _ENV_PATH
+    # Append mode creates the file if missing without an exists() probe
+    open(env_path, "a").close()
 
-    from dotenv import load_dotenv, set_key
+    from dotenv import load_dotenv
 
     load_dotenv(env_path)
 
     # --- Jira ---
-    print("  Jira Configuration")
-    print("  " + "-" * 40)
+    sys.stdout.write(f"  Jira Configuration\n{_RULE}\n")
     jira_url = prompt("URL", os.getenv("JIRA_URL", ""))
     jira_user = prompt("User email", os.getenv("JIRA_USER", ""))
     jira_project = prompt("Project key", os.getenv("JIRA_PROJECT_KEY", ""))
@@ -205,8 +245,7 @@ def main() -> None:
     print()
 
     # --- GitHub ---
-    print("  GitHub Configuration")
-    print("  " + "-" * 40)
+    sys.stdout.write(f"  GitHub Configuration\n{_RULE}\n")
     github_repo = prompt("Repo (owner/repo)", os.getenv("GITHUB_REPO", ""))
     base_branch = prompt("Base branch", os.getenv("BASE_BRANCH", "dev"))
 
@@ -222,49 +261,78 @@ def main() -> None:
         print()
 
     # --- Validate credentials ---
-    print()
-    print("  Validating credentials...")
-    print("  " + "-" * 40)
-    jira_token = _ensure_jira_token(jira_url, jira_user, jira_token, env_path)
-    github_token = _ensure_github_token(github_token, github_repo, env_path)
+    sys.stdout.write(f"\n  Validating credentials...\n{_RULE}\n")
+    print("  Checking Jira and GitHub connections...")
+    jira_ok, github_ok = _validate_all(jira_url, jira_user, jira_token, github_token, github_repo)
+    if jira_ok:
+        print("  Jira connection OK.")
+    else:
+        jira_token = _ensure_jira_token(jira_url, jira_user, jira_token, env_path)
+    if github_ok:
+        print("  GitHub connection OK.")
+    else:
+        github_token = _ensure_github_token(github_token, github_repo, env_path)
     print()
 
-    # Persist to .env and set for current process
-    for key, val in [
-        ("JIRA_URL", jira_url),
-        ("JIRA_USER", jira_user),
-        ("JIRA_PROJECT_KEY", jira_project),
-        ("JIRA_API_TOKEN", jira_token),
-        ("GITHUB_REPO", github_repo),
-        ("BASE_BRANCH", base_branch),
-        ("GITHUB_TOKEN", github_token),
-        ("OPENAI_API_KEY", openai_key),
-    ]:
-        if val:
-            os.environ[key] = val
-            set_key(env_path, key, val)
+    # Persist to .env in one write and set for current process
+    from auth import write_env
+
+    new_values = {
+        key: val
+        for key, val in [
+            ("JIRA_URL", jira_url),
+            ("JIRA_USER", jira_user),
+            ("JIRA_PROJECT_KEY", jira_project),
+            ("JIRA_API_TOKEN", jira_token),
+            ("GITHUB_REPO", github_repo),
+            ("BASE_BRANCH", base_branch),
+            ("GITHUB_TOKEN", github_token),
+            ("OPENAI_API_KEY", openai_key),
+        ]
+        if val
+    }
+    os.environ.update(new_values)
+    write_env(new_values)
 
     # --- Requirement ---
-    print("=" * 58)
-    print()
+    sys.stdout.write(f"{_BANNER}\n\n")
     requirement = input("  Enter your requirement:\n  > ").strip()
     if not requirement:
         print("  No requirement provided. Exiting.")
         sys.exit(1)
 
-    print()
-    print("=" * 58)
-    print(f"  Jira     : {jira_url} ({jira_project})")
-    print(f"  GitHub   : {github_repo} (branch: {base_branch})")
-    print(f"  Assignee : {jira_user}")
-    print("=" * 58)
+    sys.stdout.write(
+        f"\n{_BANNER}\n"
+        f"  Jira     : {jira_url} ({jira_project})\n"
+        f"  GitHub   : {github_repo} (branch: {base_branch})\n"
+        f"  Assignee : {jira_user}\n"
+        f"{_BANNER}\n"
+    )
 
     import asyncio
 
     from pipeline.dev_pipeline import run_pipeline
 
-    asyncio.run(run_pipeline(requirement))
+    if not sys.stdout.isatty():
+        # Piped / CI runs get one JSON line per pipeline event instead of banners.
+        # Only the "pipeline" logger is wired up: the root logger is left alone so
+        # library INFO records (AutoGen LLM-call events, httpx) stay silent.
+        import logging
+
+        from pipeline.ui import JsonLogFormatter, logger
+
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(JsonLogFormatter())
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+    with asyncio.Runner() as runner:
+        runner.run(run_pipeline(requirement))
 
 
 if __name__ == "__main__":
+    if any(arg in ("-h", "--help") for arg in sys.argv[1:]):
+        print(__doc__.strip())
+        sys.exit(0)
     main()
@@ -11,15 +11,27 @@ are reached.  PRs are NEVER merged automatically.
 
 from __future__ import annotations
 
+import asyncio
 import re
+from typing import Any, Callable
 
 from autogen_agentchat.agents import AssistantAgent
-from autogen_agentchat.conditions import TextMentionTermination, MaxMessageTermination
+from autogen_agentchat.base import TaskResult, TerminatedException, TerminationCondition
+from autogen_agentchat.conditions import MaxMessageTermination
+from autogen_agentchat.messages import (
+    StopMessage,
+    TextMessage,
+    ToolCallExecutionEvent,
+    ToolCallRequestEvent,
+    ToolCallSummaryMessage,
+)
 from autogen_agentchat.teams import RoundRobinGroupChat
+from autogen_core.tools import FunctionTool
 from autogen_ext.models.openai import OpenAIChatCompletionClient
 
 from config import get_config
-from pipeline.ui import PipelineUI, pretty_console, PM, DEV, ARCH, FIX
+from pipeline.ui import PipelineUI, pretty_console, quiet_console, PM, DEV, ARCH, FIX
+from tools._prewarm import prewarm_clients
 from tools.jira_tools import create_jira_issue, get_jira_issue, add_jira_comment
 from tools.github_tools import (
     get_repo_tree,
@@ -33,6 +45,9 @@ from tools.github_tools import (
     get_pr_review_comments,
     add_pr_review,
     approve_pull_request,
+    fetch_pr_bundle,
+    commit_count,
+    reset_caches,
 )
 
 # ---------------------------------------------------------------------------
@@ -48,7 +63,9 @@ When given a requirement:
 3. Write acceptance criteria as a numbered list.
 4. Call create_jira_issue to create the task (it will be auto-assigned).
 
-After creating the issue, report the issue key and end your message with PHASE_COMPLETE.
+After creating the issue, end your message with exactly these two lines:
+Issue: <ISSUE_KEY>
+PHASE_COMPLETE
 """
 
 DEV_SYSTEM_MESSAGE = """\
@@ -102,8 +119,8 @@ ARCH_SYSTEM_MESSAGE = """\
 You are a Senior Software Architect reviewing a Pull Request.
 
 Review process:
-1. Call get_pr_diff to read the full diff.
-2. Call get_pr_files to list changed files.
+1. Read the changed files and full diff included in your task.
+2. Call get_pr_diff / get_pr_files only if they are missing or report an error.
 3. If needed, call get_file_content for additional context.
 4. Evaluate the changes for:
    - Correctness: Does it fulfill the Jira task?
@@ -128,37 +145,199 @@ NEVER merge any PR.
 """
 
 
+# ---------------------------------------------------------------------------
+# Tool sets
+#
+# Tool schemas and system messages form the start of every request, so they
+# are kept byte-identical across phases and rounds; that static prefix is what
+# OpenAI's automatic prompt caching matches on.  Per-run values (Jira key, PR
+# number, diff) only ever appear at the end of the task message.
+# ---------------------------------------------------------------------------
+
+# Each callable is wrapped in a FunctionTool exactly once per process, so its
+# JSON schema is derived from the signature and docstring a single time and
+# the same object is shared by every agent, phase and review round.
+_TOOL_CACHE: dict[Callable[..., Any], FunctionTool] = {}
+
+
+def _tools(*fns: Callable[..., Any]) -> list[FunctionTool]:
+    for fn in fns:
+        if fn not in _TOOL_CACHE:
+            _TOOL_CACHE[fn] = FunctionTool(fn, description=fn.__doc__ or "")
+    return [_TOOL_CACHE[fn] for fn in fns]
+
+
+PM_TOOLS = _tools(create_jira_issue)
+
+DEV_TOOLS = _tools(
+    get_jira_issue,
+    get_repo_tree,
+    get_file_content,
+    create_branch,
+    create_or_update_file,
+    create_pull_request,
+    add_jira_comment,
+)
+
+DEV_FIX_TOOLS = _tools(
+    get_pr_reviews,
+    get_pr_review_comments,
+    get_repo_tree,
+    get_file_content,
+    create_or_update_file,
+    add_jira_comment,
+)
+
+ARCH_TOOLS = _tools(
+    get_pr_diff,
+    get_pr_files,
+    get_file_content,
+    add_pr_review,
+    approve_pull_request,
+)
+
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
+_JIRA_KEY_RE = re.compile(r"([A-Z]+-\d+)")
+_PR_HASH_RE  = re.compile(r"PR #(\d+)")
+_PR_URL_RE   = re.compile(r"pull/(\d+)")
+_TAIL_CHARS  = 2048
+
 
-def _search_messages(messages: list, pattern: str) -> str | None:
+def _search_messages(messages: list, pattern: re.Pattern[str]) -> str | None:
     """Search all messages for a regex match, returning the first capture group."""
+    parts = []
     for msg in messages:
         content = getattr(msg, "content", "")
         if isinstance(content, list):
-            for item in content:
-                text = str(getattr(item, "content", ""))
-                m = re.search(pattern, text)
-                if m:
-                    return m.group(1)
+            parts.extend(str(getattr(item, "content", "")) for item in content)
         elif isinstance(content, str):
-            m = re.search(pattern, content)
-            if m:
-                return m.group(1)
+            parts.append(content)
+    # One scan over the whole conversation instead of one per message part.
+    # Agents announce the key / PR number in their closing report, so try the
+    # last few KB first before scanning file dumps and diffs.
+    text = "\n".join(parts)
+    m = None
+    if len(text) > _TAIL_CHARS:
+        start = len(text) - _TAIL_CHARS
+        # Step past a word cut by the window edge so "ABC-12" never matches as "BC-12"
+        while start < len(text) and text[start - 1].isalnum() and text[start].isalnum():
+            start += 1
+        m = pattern.search(text, start)
+    if m is None:
+        m = pattern.search(text)
+    return m.group(1) if m else None
+
+
+def _issue_key(text: str) -> str | None:
+    """Return the key from the PM's closing ``Issue: <KEY>`` line, if present."""
+    for line in reversed(text.splitlines()):
+        line = line.strip()
+        if line.startswith("Issue:"):
+            m = _JIRA_KEY_RE.fullmatch(line[6:].strip())
+            return m.group(1) if m else None
     return None
 
 
 def _last_text(messages: list) -> str:
     """Get the text of the last message in the list."""
-    for msg in reversed(messages):
-        content = getattr(msg, "content", "")
-        if isinstance(content, str) and content.strip():
+    # Every AutoGen chat message/event carries ``content``; tool events hold lists.
+    for i in range(len(messages) - 1, -1, -1):
+        content = messages[i].content
+        if type(content) is str and content.strip():
             return content
     return ""
 
 
+_TOOL_ACTIVITY = (ToolCallRequestEvent, ToolCallExecutionEvent, ToolCallSummaryMessage)
+
+
+class _NoProgressTermination(TerminationCondition):
+    """Stop once the agent has produced ``max_idle`` messages in a row without a tool call.
+
+    An agent that has finished its tool work but keeps talking instead of
+    emitting its phase keyword would otherwise spend an LLM call per message
+    until MaxMessageTermination trips.
+    """
+
+    def __init__(self, max_idle: int = 3) -> None:
+        self._max_idle = max_idle
+        self._idle = 0
+        self._terminated = False
+
+    @property
+    def terminated(self) -> bool:
+        return self._terminated
+
+    async def __call__(self, messages) -> StopMessage | None:
+        if self._terminated:
+            raise TerminatedException("Termination condition has already been reached")
+        for msg in messages:
+            if isinstance(msg, _TOOL_ACTIVITY):
+                self._idle = 0
+            elif msg.source != "user":
+                self._idle += 1
+        if self._idle >= self._max_idle:
+            self._terminated = True
+            return StopMessage(
+                content=f"No tool activity in the last {self._idle} messages",
+                source="NoProgressTermination",
+            )
+        return None
+
+    async def reset(self) -> None:
+        self._idle = 0
+        self._terminated = False
+
+
+class _KeywordTermination(TerminationCondition):
+    """Stop when an agent message mentions any of the phase keywords.
+
+    One compiled alternation replaces a TextMentionTermination per keyword,
+    so each message is scanned once however many keywords a phase ends on.
+    Only text the agents write themselves counts: the task message and tool
+    output (ToolCallSummaryMessage) may quote the keywords from diffs or files.
+    """
+
+    def __init__(self, *keywords: str) -> None:
+        self._pattern = re.compile("|".join(map(re.escape, keywords)))
+        self._terminated = False
+
+    @property
+    def terminated(self) -> bool:
+        return self._terminated
+
+    async def __call__(self, messages) -> StopMessage | None:
+        if self._terminated:
+            raise TerminatedException("Termination condition has already been reached")
+        for msg in messages:
+            if not isinstance(msg, TextMessage) or msg.source == "user":
+                continue
+            m = self._pattern.search(msg.content)
+            if m:
+                self._terminated = True
+                return StopMessage(
+                    content=f"Keyword '{m.group(0)}' mentioned",
+                    source="KeywordTermination",
+                )
+        return None
+
+    async def reset(self) -> None:
+        self._terminated = False
+
+
+def _until(*keywords: str, max_messages: int) -> TerminationCondition:
+    """Build a fresh stop condition: any keyword, the message cap, or no progress."""
+    return (
+        _KeywordTermination(*keywords)
+        | MaxMessageTermination(max_messages)
+        | _NoProgressTermination(3)
+    )
+
+
 # ---------------------------------------------------------------------------
 # Pipeline
 # ---------------------------------------------------------------------------
@@ -169,166 +348,158 @@ async def run_pipeline(requirement: str) -> None:
 
     cfg = get_config()
     ui  = PipelineUI()
+    reset_caches()
+    # Only render the agent stream when someone is watching a terminal
+    console = pretty_console if ui.interactive else quiet_console
+
+    # One client per model for the whole run: agents stay independent, but
+    # they share the HTTP connection pool instead of re-handshaking per phase.
+    clients: dict[str, OpenAIChatCompletionClient] = {}
+
+    def _client(model: str) -> OpenAIChatCompletionClient:
+        if model not in clients:
+            clients[model] = OpenAIChatCompletionClient(model=model, api_key=cfg.OPENAI_API_KEY)
+        return clients[model]
+
+    async def _run_agent(
+        name: str, model: str, system_message: str, tools: list[FunctionTool], task: str,
+        termination: TerminationCondition,
+    ) -> TaskResult:
+        """Run a fresh single-agent team, so every phase starts with empty context."""
+        agent = AssistantAgent(
+            name=name,
+            model_client=_client(model),
+            system_message=system_message,
+            tools=tools,
+        )
+        team = RoundRobinGroupChat(participants=[agent], termination_condition=termination)
+        return await console(team.run_stream(task=task), ui)
 
-    def _dev_client():
-        return OpenAIChatCompletionClient(model=cfg.DEVELOPER_MODEL, api_key=cfg.OPENAI_API_KEY)
-
-    def _arch_client():
-        return OpenAIChatCompletionClient(model=cfg.ARCHITECT_MODEL, api_key=cfg.OPENAI_API_KEY)
-
-    def _pm_client():
-        return OpenAIChatCompletionClient(model=cfg.PM_MODEL, api_key=cfg.OPENAI_API_KEY)
-
-    # ── Show header and architecture ──────────────────────────
-    ui.show_header(cfg.JIRA_URL, cfg.GITHUB_REPO, cfg.BASE_BRANCH, cfg.JIRA_USER)
-    ui.show_architecture()
-
-    # ========== Phase 1: PM creates Jira task ==========
-    ui.phase_start(PM, cfg.PM_MODEL)
-
-    pm = AssistantAgent(
-        name="product_manager",
-        model_client=_pm_client(),
-        system_message=PM_SYSTEM_MESSAGE,
-        tools=[create_jira_issue],
-    )
-    pm_team = RoundRobinGroupChat(
-        participants=[pm],
-        termination_condition=TextMentionTermination("PHASE_COMPLETE") | MaxMessageTermination(20),
-    )
-    pm_result = await pretty_console(pm_team.run_stream(task=requirement), ui)
-
-    jira_key = _search_messages(pm_result.messages, r"([A-Z]+-\d+)")
-    if not jira_key:
-        print(f"\n  \033[91mERROR: Could not extract Jira issue key. Aborting.\033[0m")
-        return
-
-    ui.phase_end(PM)
-    ui.context_arrow("Jira ticket created", f"{jira_key}  ({cfg.JIRA_URL}/browse/{jira_key})")
-
-    # ========== Phase 2: Developer implements & creates PR ==========
-    ui.phase_start(DEV, cfg.DEVELOPER_MODEL)
-
-    dev_task = (
-        f"Read Jira ticket {jira_key} and implement the required changes.\n"
-        f"Create a feature branch, make the code changes, and create a Pull Request.\n"
-        f"Add a comment to {jira_key} with the PR link.\n"
-        f"You must complete ALL steps described in your system instructions."
-    )
-
-    dev = AssistantAgent(
-        name="developer",
-        model_client=_dev_client(),
-        system_message=DEV_SYSTEM_MESSAGE,
-        tools=[
-            get_jira_issue,
-            get_repo_tree,
-            get_file_content,
-            create_branch,
-            create_or_update_file,
-            create_pull_request,
-            add_jira_comment,
-        ],
-    )
-    dev_team = RoundRobinGroupChat(
-        participants=[dev],
-        termination_condition=TextMentionTermination("PHASE_COMPLETE") | MaxMessageTermination(60),
-    )
-    dev_result = await pretty_console(dev_team.run_stream(task=dev_task), ui)
+    # Warm the GitHub/Jira clients while the header renders and the PM thinks;
+    # keep a reference so the task is not garbage-collected mid-flight.
+    prewarm = asyncio.create_task(prewarm_clients())
 
-    pr_number_str = (
-        _search_messages(dev_result.messages, r"PR #(\d+)")
-        or _search_messages(dev_result.messages, r"pull/(\d+)")
-    )
-    if not pr_number_str:
-        print(f"\n  \033[91mERROR: Could not extract PR number. Aborting.\033[0m")
-        return
-    pr_number = int(pr_number_str)
-
-    ui.phase_end(DEV)
-    ui.context_arrow(
-        "Pull Request created",
-        f"PR #{pr_number}  (https://github.com/{cfg.GITHUB_REPO}/pull/{pr_number})",
-    )
+    try:
+        # ── Show header and architecture ──────────────────────────
+        ui.show_header(cfg.JIRA_URL, cfg.GITHUB_REPO, cfg.BASE_BRANCH, cfg.JIRA_USER)
+        ui.show_architecture()
 
-    # ========== Phase 3: Review loop ==========
-    max_rounds = 3
-    for round_num in range(1, max_rounds + 1):
+        # ========== Phase 1: PM creates Jira task ==========
+        ui.phase_start(PM, cfg.PM_MODEL)
 
-        # --- 3a: Architect reviews ---
-        ui.phase_start(ARCH, cfg.ARCHITECT_MODEL, round_num=round_num)
+        pm_result = await _run_agent(
+            "product_manager", cfg.PM_MODEL, PM_SYSTEM_MESSAGE, PM_TOOLS,
+            requirement, _until("PHASE_COMPLETE", max_messages=20),
+        )
 
-        arch_task = (
-            f"Review Pull Request #{pr_number} on the repository.\n"
-            f"Get the diff, examine the changes, and submit your review.\n"
-            f"APPROVE if the code is correct and complete, or REQUEST_CHANGES with feedback."
+        # Trust the PM's "Issue:" handoff line; scan the conversation only if it is missing
+        jira_key = (
+            _issue_key(_last_text(pm_result.messages))
+            or _search_messages(pm_result.messages, _JIRA_KEY_RE)
         )
-        arch = AssistantAgent(
-            name="architect",
-            model_client=_arch_client(),
-            system_message=ARCH_SYSTEM_MESSAGE,
-            tools=[
-                get_pr_diff,
-                get_pr_files,
-                get_file_content,
-                add_pr_review,
-                approve_pull_request,
-            ],
+        if not jira_key:
+            ui.error("Could not extract Jira issue key. Aborting.")
+            return
+
+        ui.phase_end(PM)
+        ui.context_arrow("Jira ticket created", f"{jira_key}  ({cfg.JIRA_URL}/browse/{jira_key})")
+
+        # ========== Phase 2: Developer implements & creates PR ==========
+        ui.phase_start(DEV, cfg.DEVELOPER_MODEL)
+
+        dev_task = (
+            "Read the Jira ticket below and implement the required changes.\n"
+            "Create a feature branch, make the code changes, and create a Pull Request.\n"
+            "Add a comment to the ticket with the PR link.\n"
+            "You must complete ALL steps described in your system instructions.\n\n"
+            f"Jira ticket: {jira_key}"
         )
-        arch_team = RoundRobinGroupChat(
-            participants=[arch],
-            termination_condition=(
-                TextMentionTermination("APPROVED")
-                | TextMentionTermination("CHANGES_REQUESTED")
-                | MaxMessageTermination(30)
-            ),
+        dev_result = await _run_agent(
+            "developer", cfg.DEVELOPER_MODEL, DEV_SYSTEM_MESSAGE, DEV_TOOLS,
+            dev_task, _until("PHASE_COMPLETE", max_messages=60),
         )
-        arch_result = await pretty_console(arch_team.run_stream(task=arch_task), ui)
-
-        arch_comment = _last_text(arch_result.messages)
-        approved = "APPROVED" in arch_comment.upper()
-
-        ui.phase_end(ARCH)
-        ui.review_verdict(arch_comment, approved)
-
-        if approved:
-            break
 
-        if round_num == max_rounds:
-            print(f"\n  \033[93mWARNING: Max review rounds ({max_rounds}) reached.\033[0m\n")
-            break
-
-        # --- 3b: Developer fixes ---
-        ui.context_arrow("Review feedback", "CHANGES REQUESTED — Developer will fix")
-        ui.phase_start(FIX, cfg.DEVELOPER_MODEL, round_num=round_num)
-
-        fix_task = (
-            f"Read the review comments on PR #{pr_number}.\n"
-            f"Fix ALL issues raised by the architect.\n"
-            f"Push the fixes to the same feature branch.\n"
-            f"You must complete ALL steps described in your system instructions."
+        pr_number_str = (
+            _search_messages(dev_result.messages, _PR_HASH_RE)
+            or _search_messages(dev_result.messages, _PR_URL_RE)
         )
-        dev_fix = AssistantAgent(
-            name="developer",
-            model_client=_dev_client(),
-            system_message=DEV_FIX_SYSTEM_MESSAGE,
-            tools=[
-                get_pr_reviews,
-                get_pr_review_comments,
-                get_repo_tree,
-                get_file_content,
-                create_or_update_file,
-                add_jira_comment,
-            ],
+        if not pr_number_str:
+            ui.error("Could not extract PR number. Aborting.")
+            return
+        pr_number = int(pr_number_str)
+
+        ui.phase_end(DEV)
+        ui.context_arrow(
+            "Pull Request created",
+            f"PR #{pr_number}  (https://github.com/{cfg.GITHUB_REPO}/pull/{pr_number})",
         )
-        dev_fix_team = RoundRobinGroupChat(
-            participants=[dev_fix],
-            termination_condition=TextMentionTermination("PHASE_COMPLETE") | MaxMessageTermination(60),
-        )
-        await pretty_console(dev_fix_team.run_stream(task=fix_task), ui)
-
-        ui.phase_end(FIX)
-        ui.context_arrow("Fixes pushed", f"PR #{pr_number} updated — back to Architect Review")
 
-    # ========== Summary ==========
-    ui.show_summary(cfg.JIRA_URL, jira_key, cfg.GITHUB_REPO, pr_number)
+        # ========== Phase 3: Review loop ==========
+        max_rounds = 3
+        for round_num in range(1, max_rounds + 1):
+
+            # --- 3a: Architect reviews ---
+            ui.phase_start(ARCH, cfg.ARCHITECT_MODEL, round_num=round_num)
+
+            # Fetch the REST diff and the GraphQL files/reviews/comments bundle
+            # in parallel so the architect does not spend tool-call round-trips.
+            bundle = await fetch_pr_bundle(pr_number)
+            pr_diff, pr_context = bundle["diff"], bundle["context"]
+            arch_task = (
+                "Review the Pull Request below on the repository.\n"
+                "The changed files, earlier reviews and full diff are included; examine the changes and submit your review.\n"
+                "APPROVE if the code is correct and complete, or REQUEST_CHANGES with feedback.\n\n"
+                f"Pull Request: #{pr_number}\n\n"
+                f"{pr_context}\n\n"
+                f"Diff:\n{pr_diff}"
+            )
+            arch_result = await _run_agent(
+                "architect", cfg.ARCHITECT_MODEL, ARCH_SYSTEM_MESSAGE, ARCH_TOOLS,
+                arch_task, _until("APPROVED", "CHANGES_REQUESTED", max_messages=30),
+            )
+
+            arch_comment = _last_text(arch_result.messages)
+            approved = "APPROVED" in arch_comment.upper()
+
+            ui.phase_end(ARCH)
+            ui.review_verdict(arch_comment, approved)
+
+            if approved:
+                break
+
+            if round_num == max_rounds:
+                ui.warning(f"Max review rounds ({max_rounds}) reached.")
+                break
+
+            # --- 3b: Developer fixes ---
+            ui.context_arrow("Review feedback", "CHANGES REQUESTED — Developer will fix")
+            ui.phase_start(FIX, cfg.DEVELOPER_MODEL, round_num=round_num)
+
+            fix_task = (
+                "Read the review comments on the Pull Request below.\n"
+                "Fix ALL issues raised by the architect.\n"
+                "Push the fixes to the same feature branch.\n"
+                "You must complete ALL steps described in your system instructions.\n\n"
+                f"Pull Request: #{pr_number}"
+            )
+            commits_before = commit_count()
+            await _run_agent(
+                "developer", cfg.DEVELOPER_MODEL, DEV_FIX_SYSTEM_MESSAGE, DEV_FIX_TOOLS,
+                fix_task, _until("PHASE_COMPLETE", max_messages=60),
+            )
+
+            ui.phase_end(FIX)
+
+            # Re-reviewing an unchanged PR would only repeat the last verdict
+            if commit_count() == commits_before:
+                ui.warning(f"No new commits on PR #{pr_number} after fixes — skipping further review.")
+                break
+
+            ui.context_arrow("Fixes pushed", f"PR #{pr_number} updated — back to Architect Review")
+
+        # ========== Summary ==========
+        ui.show_summary(cfg.JIRA_URL, jira_key, cfg.GITHUB_REPO, pr_number)
+    finally:
+        prewarm.cancel()
+        for client in clients.values():
+            await client.close()
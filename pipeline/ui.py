@@ -8,7 +8,18 @@ executive demos where readability and visual flow matter.
 from __future__ import annotations
 
 import json
-from typing import Any
+import logging
+import re
+import sys
+from string import Template
+from typing import Any, Callable
+
+try:  # optional, several times faster on large tool arguments (file contents)
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+logger = logging.getLogger("pipeline")
 
 
 # ── ANSI escape codes ──────────────────────────────────────────────
@@ -33,6 +44,16 @@ class C:
     BR_CYAN = "\033[96m"
     BR_WHITE = "\033[97m"
 
+    # Color + bold merged into one SGR sequence, so a styled span costs a
+    # single escape instead of two back-to-back ones.
+    WHITE_BOLD      = "\033[37;1m"
+    BR_GREEN_BOLD   = "\033[92;1m"
+    BR_YELLOW_BOLD  = "\033[93;1m"
+    BR_BLUE_BOLD    = "\033[94;1m"
+    BR_MAGENTA_BOLD = "\033[95;1m"
+    BR_CYAN_BOLD    = "\033[96;1m"
+    BR_WHITE_BOLD   = "\033[97;1m"
+
 
 # ── Phase constants ────────────────────────────────────────────────
 
@@ -43,150 +64,295 @@ FIX  = "fix"
 DONE = "done"
 
 PHASE_META = {
-    PM:   {"label": "Product Manager",  "short": "PM",   "color": C.BR_CYAN},
-    DEV:  {"label": "Developer",        "short": "DEV",  "color": C.BR_BLUE},
-    ARCH: {"label": "Architect Review", "short": "ARCH", "color": C.BR_YELLOW},
-    FIX:  {"label": "Developer Fix",    "short": "FIX",  "color": C.BR_MAGENTA},
-    DONE: {"label": "Complete",         "short": "DONE", "color": C.BR_GREEN},
+    PM:   {"label": "Product Manager",  "short": "PM",   "color": C.BR_CYAN,    "bold": C.BR_CYAN_BOLD},
+    DEV:  {"label": "Developer",        "short": "DEV",  "color": C.BR_BLUE,    "bold": C.BR_BLUE_BOLD},
+    ARCH: {"label": "Architect Review", "short": "ARCH", "color": C.BR_YELLOW,  "bold": C.BR_YELLOW_BOLD},
+    FIX:  {"label": "Developer Fix",    "short": "FIX",  "color": C.BR_MAGENTA, "bold": C.BR_MAGENTA_BOLD},
+    DONE: {"label": "Complete",         "short": "DONE", "color": C.BR_GREEN,   "bold": C.BR_GREEN_BOLD},
+}
+
+# Progress-bar label of each phase in each state, and the joint between them
+_PHASE_LABEL: dict[tuple[str, str], str] = {
+    (phase, state): label
+    for phase, meta in PHASE_META.items()
+    for state, label in (
+        ("current", f"{meta['bold']}◉ {meta['short']}{C.RESET}"),
+        ("done",    f"{C.GREEN}● {meta['short']}{C.RESET}"),
+        ("pending", f"{C.GRAY}○ {meta['short']}{C.RESET}"),
+    )
 }
+_PHASE_SEP = f" {C.GRAY}────{C.RESET} "
 
+# agent name -> (text color, bold header style)
 AGENT_COLORS = {
-    "product_manager": C.BR_CYAN,
-    "developer":       C.BR_BLUE,
-    "architect":       C.BR_YELLOW,
+    "product_manager": (C.BR_CYAN,   C.BR_CYAN_BOLD),
+    "developer":       (C.BR_BLUE,   C.BR_BLUE_BOLD),
+    "architect":       (C.BR_YELLOW, C.BR_YELLOW_BOLD),
 }
 
 
+# ── Banner rules and boxes (fixed widths, built once) ─────────────
+
+_RULE_DOUBLE = "═" * 60
+_RULE_HEAVY  = "━" * 60
+_HEADER_TITLE  = f"{'MULTI-AGENT DEVELOPMENT PIPELINE':^60}"
+_SUMMARY_TITLE = f"{'PIPELINE COMPLETE':^60}"
+
+_BOX_TOP = f"╔{'═' * 50}╗"
+_BOX_BOT = f"╚{'═' * 50}╝"
+_BOX_APPROVED = f"║{'✓  P R   A P P R O V E D':^50}║"
+_BOX_CHANGES  = f"║{'↻  C H A N G E S   R E Q U E S T E D':^50}║"
+
+
 # ── Tool output summarization ─────────────────────────────────────
 
-def _summarize_args(name: str, arguments: str) -> str:
+def _file_write_args(args: dict) -> str:
+    lines = args.get("content", "").count("\n") + 1
+    return f"{args.get('file_path', '')} ({lines} lines)"
+
+
+# tool name -> brief description of its call arguments
+_ARG_SUMMARIZERS: dict[str, Callable[[dict], str]] = {
+    "get_file_content":      lambda a: a.get("file_path", ""),
+    "get_repo_tree":         lambda a: a.get("path", "") or "/",
+    "create_branch":         lambda a: a.get("branch_name", ""),
+    "create_or_update_file": _file_write_args,
+    "create_pull_request":   lambda a: a.get("title", "")[:60],
+    "create_jira_issue":     lambda a: a.get("summary", "")[:60],
+    "get_jira_issue":        lambda a: a.get("issue_key", ""),
+    "add_jira_comment":      lambda a: a.get("issue_key", ""),
+    "add_pr_review":         lambda a: a.get("event", "COMMENT"),
+}
+
+_PR_NUMBER_TOOLS = frozenset({
+    "get_pr_diff", "get_pr_files", "get_pr_reviews",
+    "get_pr_review_comments", "approve_pull_request",
+})
+_ARG_SUMMARIZERS.update(
+    dict.fromkeys(_PR_NUMBER_TOOLS, lambda a: f"PR #{a.get('pr_number', '?')}")
+)
+
+
+def _parse_args(arguments: str | dict) -> dict:
+    """Decode a tool call's JSON arguments once; {} if they are not valid JSON."""
+    if not isinstance(arguments, str):
+        return arguments
     try:
-        args = json.loads(arguments) if isinstance(arguments, str) else arguments
-    except Exception:
-        return ""
-
-    if name == "get_file_content":
-        return args.get("file_path", "")
-    if name == "get_repo_tree":
-        return args.get("path", "") or "/"
-    if name == "create_branch":
-        return args.get("branch_name", "")
-    if name == "create_or_update_file":
-        path = args.get("file_path", "")
-        lines = args.get("content", "").count("\n") + 1
-        return f"{path} ({lines} lines)"
-    if name == "create_pull_request":
-        return args.get("title", "")[:60]
-    if name == "create_jira_issue":
-        return args.get("summary", "")[:60]
-    if name == "get_jira_issue":
-        return args.get("issue_key", "")
-    if name == "add_jira_comment":
-        return args.get("issue_key", "")
-    if name == "add_pr_review":
-        return args.get("event", "COMMENT")
-    if name in (
-        "get_pr_diff", "get_pr_files", "get_pr_reviews",
-        "get_pr_review_comments", "approve_pull_request",
-    ):
-        return f"PR #{args.get('pr_number', '?')}"
-    return ""
+        args = _json_loads(arguments)
+    except ValueError:
+        return {}
+    return args if isinstance(args, dict) else {}
+
+
+def _summarize_args(name: str, args: dict) -> str:
+    summarize = _ARG_SUMMARIZERS.get(name)
+    return summarize(args) if summarize is not None else ""
+
+
+def _line_count(text: str) -> int:
+    return text.count("\n") + 1
+
+
+def _tree_result(result: str) -> str:
+    # get_repo_tree emits exactly one marker per entry line
+    return f"Found {result.count('[FILE]')} files, {result.count('[DIR]')} directories"
+
+
+def _file_result(result: str) -> str:
+    if result.startswith("Error"):
+        return result[:80]
+    return f"Read {_line_count(result)} lines"
+
+
+def _review_comments_result(result: str) -> str:
+    c = result.count("File:")
+    return f"{c} inline comment(s)" if c else result.split("\n")[0][:80]
+
+
+# tool name -> one-line summary of its (non-empty) result
+_RESULT_SUMMARIZERS: dict[str, Callable[[str], str]] = {
+    "get_repo_tree":          _tree_result,
+    "get_file_content":       _file_result,
+    "get_pr_diff":            lambda r: f"Diff retrieved ({_line_count(r)} lines)",
+    "get_pr_reviews":         lambda r: f"{r.count('Reviewer:')} review(s) found",
+    "get_pr_review_comments": _review_comments_result,
+    "get_pr_files":           lambda r: f"{_line_count(r.strip())} file(s) changed",
+}
 
 
 def _summarize_result(name: str, result: str) -> str:
     if not result:
         return "(empty)"
-    if name == "get_repo_tree":
-        lines = [l for l in result.split("\n") if l.strip()]
-        dirs  = sum(1 for l in lines if "[DIR]" in l)
-        files = sum(1 for l in lines if "[FILE]" in l)
-        return f"Found {files} files, {dirs} directories"
-    if name == "get_file_content":
-        if result.startswith("Error"):
-            return result[:80]
-        return f"Read {result.count(chr(10)) + 1} lines"
-    if name == "get_pr_diff":
-        return f"Diff retrieved ({result.count(chr(10)) + 1} lines)"
-    if name == "get_pr_reviews":
-        return f"{result.count('Reviewer:')} review(s) found"
-    if name == "get_pr_review_comments":
-        c = result.count("File:")
-        return f"{c} inline comment(s)" if c else result.split("\n")[0][:80]
-    if name == "get_pr_files":
-        c = len([l for l in result.split("\n") if l.strip()])
-        return f"{c} file(s) changed"
+    summarize = _RESULT_SUMMARIZERS.get(name)
+    if summarize is not None:
+        return summarize(result)
 
     one_line = result.replace("\n", " ").strip()
     return (one_line[:120] + "...") if len(one_line) > 120 else one_line
 
 
+# ── Message previews ──────────────────────────────────────────────
+
+# Phase keywords that are control signals, not content worth showing
+_SENTINEL_RE = re.compile("PHASE_COMPLETE|CHANGES_REQUESTED|APPROVED")
+
+
+def _head_lines(text: str, n: int) -> tuple[list[str], int]:
+    """Return the first ``n`` lines of ``text`` and how many lines follow them.
+
+    Walks newline positions with ``str.find`` so a large message is never
+    split into a full list just to show its first few lines.
+    """
+    head: list[str] = []
+    pos = 0
+    while len(head) < n:
+        end = text.find("\n", pos)
+        if end < 0:
+            head.append(text[pos:])
+            return head, 0
+        head.append(text[pos:end])
+        pos = end + 1
+    return head, text.count("\n", pos) + 1
+
+
+# ── Architecture diagram template ─────────────────────────────────
+# Fixed colors are baked in at import; only the five phase boxes ($p1, $p2,
+# $p3, $pf, $pd) are substituted per redraw.
+
+_ARCH_TEMPLATE = Template(
+    f"    $p1┌──────────────────────────────────┐{C.RESET}\n"
+    f"    $p1│  Phase 1 ─ Product Manager       │{C.RESET}  {C.GRAY}Creates Jira task{C.RESET}\n"
+    f"    $p1└────────────────┬─────────────────┘{C.RESET}\n"
+    f"    {C.GRAY}                 │ Jira ticket{C.RESET}\n"
+    f"    $p2┌────────────────▼─────────────────┐{C.RESET}\n"
+    f"    $p2│  Phase 2 ─ Developer             │{C.RESET}  {C.GRAY}Implements code, creates PR{C.RESET}\n"
+    f"    $p2└────────────────┬─────────────────┘{C.RESET}\n"
+    f"    {C.GRAY}                 │ Pull Request{C.RESET}\n"
+    f"    $p3┌────────────────▼─────────────────┐{C.RESET}\n"
+    f"    $p3│  Phase 3a ─ Architect Review     │{C.RESET}  {C.GRAY}Reviews code quality{C.RESET}\n"
+    f"    $p3└───────┬─────────────────┬────────┘{C.RESET}\n"
+    f"    {C.GREEN}    APPROVED{C.RESET}          {C.BR_YELLOW}CHANGES_REQUESTED{C.RESET}\n"
+    f"    {C.GREEN}        │{C.RESET}                   {C.BR_YELLOW}│{C.RESET}\n"
+    f"    {C.GREEN}        │{C.RESET}          $pf┌────────▼─────────┐{C.RESET}\n"
+    f"    {C.GREEN}        │{C.RESET}          $pf│ Phase 3b ─ Fix   │{C.RESET}  {C.GRAY}Fixes review issues{C.RESET}\n"
+    f"    {C.GREEN}        │{C.RESET}          $pf└────────┬─────────┘{C.RESET}\n"
+    f"    {C.GREEN}        │{C.RESET}          {C.GRAY}         └──▶ loop (max 3){C.RESET}\n"
+    f"    $pd┌───────▼──────────────────────────┐{C.RESET}\n"
+    f"    $pd│  Pipeline Complete               │{C.RESET}  {C.GRAY}PR open — manual merge{C.RESET}\n"
+    f"    $pd└──────────────────────────────────┘{C.RESET}"
+)
+
+# Box color for a phase that is not highlighted, keyed by "is completed"
+_STATE_COLORS = {True: C.GREEN, False: C.GRAY}
+
+
+# ── Terminal output ───────────────────────────────────────────────
+
+_SGR_RUN_RE = re.compile(r"(?:\x1b\[[\d;]*m){2,}")
+_SGR_PARAMS_RE = re.compile(r"\x1b\[([\d;]*)m")
+
+
+def _merge_sgr(m: re.Match[str]) -> str:
+    params: list[str] = []
+    for group in _SGR_PARAMS_RE.findall(m.group(0)):
+        for code in (group or "0").split(";"):
+            if code in ("", "0"):
+                params.clear()  # a reset makes everything before it moot
+                code = "0"
+            params.append(code)
+    return f"\x1b[{';'.join(params)}m"
+
+
+def _collapse_ansi(text: str) -> str:
+    """Merge back-to-back SGR escapes into one, e.g. reset+reset or reset+color."""
+    return _SGR_RUN_RE.sub(_merge_sgr, text)
+
+
+def _write(text: str) -> None:
+    """Write one finished frame, encoding it once onto the binary stdout layer.
+
+    Falls back to text mode for streams without a ``buffer`` (e.g. StringIO).
+    """
+    out = sys.stdout
+    buffer = getattr(out, "buffer", None)
+    if buffer is None:
+        out.write(text)
+        out.flush()
+        return
+    out.flush()  # keep order with anything already written in text mode
+    buffer.write(text.encode(out.encoding or "utf-8", out.errors or "strict"))
+    buffer.flush()
+
+
+# ── Structured log output ─────────────────────────────────────────
+
+class JsonLogFormatter(logging.Formatter):
+    """One JSON object per record: the event name plus its ``fields`` extra."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps({"event": record.getMessage(), **getattr(record, "fields", {})})
+
+
 # ── PipelineUI ─────────────────────────────────────────────────────
 
 class PipelineUI:
+    """Draws banners on a terminal; otherwise emits one log record per event."""
 
-    def __init__(self) -> None:
+    def __init__(self, interactive: bool | None = None) -> None:
         self.completed: set[str] = set()
         self.current: str | None = None
         self._call_names: dict[str, str] = {}
+        self.interactive = sys.stdout.isatty() if interactive is None else interactive
+        # Lines of the current frame; _emit() writes them out in one call
+        self._buf: list[str] = []
+
+    def _out(self, *lines: str) -> None:
+        self._buf.extend(line + "\n" for line in lines)
+
+    def _emit(self) -> None:
+        _write(_collapse_ansi("".join(self._buf)))
+        self._buf.clear()
 
     # ── Header ──────────────────────────────────────────
 
     def show_header(
         self, jira_url: str, github_repo: str, base_branch: str, jira_user: str,
     ) -> None:
-        w = 60
-        bar = "═" * w
+        if not self.interactive:
+            logger.info("pipeline_start", extra={"fields": {
+                "jira_url": jira_url, "github_repo": github_repo,
+                "base_branch": base_branch, "jira_user": jira_user,
+            }})
+            return
         r = C.RESET
-        print()
-        print(f"  {C.BR_CYAN}{C.BOLD}{bar}{r}")
-        print(f"  {C.BR_CYAN}{C.BOLD}{'MULTI-AGENT DEVELOPMENT PIPELINE':^{w}}{r}")
-        print(f"  {C.BR_CYAN}{C.BOLD}{bar}{r}")
-        print(f"  {C.GRAY}  Jira     : {jira_url}{r}")
-        print(f"  {C.GRAY}  GitHub   : {github_repo}  (base: {base_branch}){r}")
-        print(f"  {C.GRAY}  Assignee : {jira_user}{r}")
-        print()
+        self._out("")
+        self._out(f"  {C.BR_CYAN_BOLD}{_RULE_DOUBLE}{r}")
+        self._out(f"  {C.BR_CYAN_BOLD}{_HEADER_TITLE}{r}")
+        self._out(f"  {C.BR_CYAN_BOLD}{_RULE_DOUBLE}{r}")
+        self._out(f"  {C.GRAY}  Jira     : {jira_url}{r}")
+        self._out(f"  {C.GRAY}  GitHub   : {github_repo}  (base: {base_branch}){r}")
+        self._out(f"  {C.GRAY}  Assignee : {jira_user}{r}")
+        self._out("")
+        self._emit()
 
     # ── Architecture diagram ────────────────────────────
 
     def show_architecture(self, highlight: str | None = None) -> None:
+        if not self.interactive:
+            return
+
         def _c(phase: str) -> str:
             if phase == highlight:
-                return PHASE_META[phase]["color"] + C.BOLD
-            if phase in self.completed:
-                return C.GREEN
-            return C.GRAY
-
-        r  = C.RESET
-        g  = C.GRAY
-        p1 = _c(PM)
-        p2 = _c(DEV)
-        p3 = _c(ARCH)
-        pf = _c(FIX)
-        pd = _c(DONE)
-
-        print(
-            f"    {p1}┌──────────────────────────────────┐{r}\n"
-            f"    {p1}│  Phase 1 ─ Product Manager       │{r}  {g}Creates Jira task{r}\n"
-            f"    {p1}└────────────────┬─────────────────┘{r}\n"
-            f"    {g}                 │ Jira ticket{r}\n"
-            f"    {p2}┌────────────────▼─────────────────┐{r}\n"
-            f"    {p2}│  Phase 2 ─ Developer             │{r}  {g}Implements code, creates PR{r}\n"
-            f"    {p2}└────────────────┬─────────────────┘{r}\n"
-            f"    {g}                 │ Pull Request{r}\n"
-            f"    {p3}┌────────────────▼─────────────────┐{r}\n"
-            f"    {p3}│  Phase 3a ─ Architect Review     │{r}  {g}Reviews code quality{r}\n"
-            f"    {p3}└───────┬─────────────────┬────────┘{r}\n"
-            f"    {C.GREEN}    APPROVED{r}          {C.BR_YELLOW}CHANGES_REQUESTED{r}\n"
-            f"    {C.GREEN}        │{r}                   {C.BR_YELLOW}│{r}\n"
-            f"    {C.GREEN}        │{r}          {pf}┌────────▼─────────┐{r}\n"
-            f"    {C.GREEN}        │{r}          {pf}│ Phase 3b ─ Fix   │{r}  {g}Fixes review issues{r}\n"
-            f"    {C.GREEN}        │{r}          {pf}└────────┬─────────┘{r}\n"
-            f"    {C.GREEN}        │{r}          {g}         └──▶ loop (max 3){r}\n"
-            f"    {pd}┌───────▼──────────────────────────┐{r}\n"
-            f"    {pd}│  Pipeline Complete               │{r}  {g}PR open — manual merge{r}\n"
-            f"    {pd}└──────────────────────────────────┘{r}"
+                return PHASE_META[phase]["bold"]
+            return _STATE_COLORS[phase in self.completed]
+
+        self._out(
+            _ARCH_TEMPLATE.substitute(
+                p1=_c(PM), p2=_c(DEV), p3=_c(ARCH), pf=_c(FIX), pd=_c(DONE),
+            ),
+            "",
         )
-        print()
+        self._emit()
 
     # ── Progress bar ────────────────────────────────────
 
@@ -196,18 +362,11 @@ class PipelineUI:
             phases.append(FIX)
         phases.append(DONE)
 
-        parts = []
-        for p in phases:
-            meta = PHASE_META[p]
-            if p == current:
-                parts.append(f"{meta['color']}{C.BOLD}◉ {meta['short']}{C.RESET}")
-            elif p in self.completed:
-                parts.append(f"{C.GREEN}● {meta['short']}{C.RESET}")
-            else:
-                parts.append(f"{C.GRAY}○ {meta['short']}{C.RESET}")
-
-        print(f"    {f' {C.GRAY}────{C.RESET} '.join(parts)}")
-        print()
+        parts = [
+            _PHASE_LABEL[p, "current" if p == current else "done" if p in self.completed else "pending"]
+            for p in phases
+        ]
+        self._out("    " + _PHASE_SEP.join(parts), "")
 
     # ── Phase transitions ───────────────────────────────
 
@@ -217,94 +376,125 @@ class PipelineUI:
         self.current = phase
         meta  = PHASE_META[phase]
         color = meta["color"]
+        bold  = meta["bold"]
         label = meta["label"]
         if round_num > 0:
             label += f"  (round {round_num}/3)"
 
+        if not self.interactive:
+            logger.info("phase_start", extra={"fields": {
+                "phase": phase, "model": model, "round": round_num,
+            }})
+            return
+
         show_fix = phase == FIX or FIX in self.completed
 
-        print()
-        print(f"  {color}{C.BOLD}{'━' * 60}{C.RESET}")
-        print(f"  {color}{C.BOLD}  ▶ {label}{C.RESET}")
-        print(f"  {color}    Model: {model}  │  Context: independent{C.RESET}")
-        print(f"  {color}{C.BOLD}{'━' * 60}{C.RESET}")
-        print()
+        self._out("")
+        self._out(f"  {bold}{_RULE_HEAVY}{C.RESET}")
+        self._out(f"  {bold}  ▶ {label}{C.RESET}")
+        self._out(f"  {color}    Model: {model}  │  Context: independent{C.RESET}")
+        self._out(f"  {bold}{_RULE_HEAVY}{C.RESET}")
+        self._out("")
         self._progress_bar(phase, show_fix)
         self.show_architecture(phase)
 
     def phase_end(self, phase: str) -> None:
         self.completed.add(phase)
+        if not self.interactive:
+            logger.info("phase_end", extra={"fields": {"phase": phase}})
+            return
         meta = PHASE_META[phase]
-        print(f"\n  {C.GREEN}  ✓ {meta['label']} completed{C.RESET}\n")
+        self._out(f"\n  {C.GREEN}  ✓ {meta['label']} completed{C.RESET}\n")
+        self._emit()
 
     # ── Context passing between agents ──────────────────
 
     def context_arrow(self, label: str, value: str) -> None:
-        print(f"  {C.BR_WHITE}{C.BOLD}  ──▶ {label}: {value}{C.RESET}\n")
+        if not self.interactive:
+            logger.info("handoff", extra={"fields": {"label": label, "value": value}})
+            return
+        self._out(f"  {C.BR_WHITE_BOLD}  ──▶ {label}: {value}{C.RESET}\n")
+        self._emit()
+
+    # ── Errors and warnings ─────────────────────────────
+
+    def error(self, message: str) -> None:
+        if not self.interactive:
+            logger.error("error", extra={"fields": {"message": message}})
+            return
+        self._out(f"\n  {C.BR_RED}ERROR: {message}{C.RESET}")
+        self._emit()
+
+    def warning(self, message: str) -> None:
+        if not self.interactive:
+            logger.warning("warning", extra={"fields": {"message": message}})
+            return
+        self._out(f"\n  {C.BR_YELLOW}WARNING: {message}{C.RESET}", "")
+        self._emit()
 
     # ── Tool call activity ──────────────────────────────
 
     def tool_call(self, agent: str, call_id: str, name: str, brief_args: str) -> None:
         self._call_names[call_id] = name
-        print(f"    {C.GRAY}⚡ {name}({brief_args}){C.RESET}", flush=True)
+        _write(f"    {C.GRAY}⚡ {name}({brief_args}){C.RESET}\n")
 
     def tool_result(self, call_id: str, result: str) -> None:
         name = self._call_names.pop(call_id, "")
         summary = _summarize_result(name, result)
         if "error" in summary.lower():
-            print(f"    {C.RED}✗ {summary}{C.RESET}")
+            _write(f"    {C.RED}✗ {summary}{C.RESET}\n")
         else:
-            print(f"    {C.GREEN}✓ {summary}{C.RESET}")
+            _write(f"    {C.GREEN}✓ {summary}{C.RESET}\n")
 
     # ── Agent text messages ─────────────────────────────
 
     def agent_message(self, agent: str, text: str) -> None:
-        clean = (
-            text.replace("PHASE_COMPLETE", "")
-                .replace("CHANGES_REQUESTED", "")
-                .strip()
-        )
+        clean = _SENTINEL_RE.sub("", text).strip()
         if not clean:
             return
 
-        color = AGENT_COLORS.get(agent, C.WHITE)
-        lines = clean.split("\n")
-        max_show = 10
+        color, bold = AGENT_COLORS.get(agent, (C.WHITE, C.WHITE_BOLD))
+        lines, more = _head_lines(clean, 10)
 
-        print()
-        print(f"    {color}{C.BOLD}{agent}:{C.RESET}")
-        for line in lines[:max_show]:
-            print(f"    {color}{line}{C.RESET}")
-        if len(lines) > max_show:
-            print(f"    {C.GRAY}... ({len(lines) - max_show} more lines){C.RESET}")
-        print()
+        self._out("")
+        self._out(f"    {bold}{agent}:{C.RESET}")
+        for line in lines:
+            self._out(f"    {color}{line}{C.RESET}")
+        if more:
+            self._out(f"    {C.GRAY}... ({more} more lines){C.RESET}")
+        self._out("")
+        self._emit()
 
     # ── Architect review verdict ────────────────────────
 
     def review_verdict(self, text: str, approved: bool) -> None:
-        print()
+        if not self.interactive:
+            logger.info("review_verdict", extra={"fields": {"approved": approved}})
+            return
         if approved:
-            c = C.BR_GREEN
-            label = "P R   A P P R O V E D"
-            icon  = "✓"
+            c = C.BR_GREEN_BOLD
+            title = _BOX_APPROVED
         else:
-            c = C.BR_YELLOW
-            label = "C H A N G E S   R E Q U E S T E D"
-            icon  = "↻"
-
-        w = 50
-        print(f"  {c}{C.BOLD}  ╔{'═' * w}╗{C.RESET}")
-        print(f"  {c}{C.BOLD}  ║{f'{icon}  {label}':^{w}}║{C.RESET}")
-        print(f"  {c}{C.BOLD}  ╚{'═' * w}╝{C.RESET}")
-
-        lines = text.strip().split("\n")
-        for line in lines[:12]:
-            clean = line.replace("APPROVED", "").replace("CHANGES_REQUESTED", "").strip()
+            c = C.BR_YELLOW_BOLD
+            title = _BOX_CHANGES
+
+        self._out(
+            "",
+            f"  {c}  {_BOX_TOP}{C.RESET}",
+            f"  {c}  {title}{C.RESET}",
+            f"  {c}  {_BOX_BOT}{C.RESET}",
+        )
+
+        # Strip the verdict keywords in one pass before taking the preview lines
+        lines, more = _head_lines(_SENTINEL_RE.sub("", text).strip(), 12)
+        for line in lines:
+            clean = line.strip()
             if clean:
-                print(f"    {C.DIM}{clean}{C.RESET}")
-        if len(lines) > 12:
-            print(f"    {C.GRAY}... ({len(lines) - 12} more lines){C.RESET}")
-        print()
+                self._out(f"    {C.DIM}{clean}{C.RESET}")
+        if more:
+            self._out(f"    {C.GRAY}... ({more} more lines){C.RESET}")
+        self._out("")
+        self._emit()
 
     # ── Final summary ───────────────────────────────────
 
@@ -314,17 +504,23 @@ class PipelineUI:
         self.current = DONE
         self.completed.add(DONE)
 
+        if not self.interactive:
+            logger.info("pipeline_complete", extra={"fields": {
+                "jira": f"{jira_url}/browse/{jira_key}",
+                "pr": f"https://github.com/{github_repo}/pull/{pr_number}",
+            }})
+            return
+
         r = C.RESET
-        w = 60
-        print()
-        print(f"  {C.BR_GREEN}{C.BOLD}{'═' * w}{r}")
-        print(f"  {C.BR_GREEN}{C.BOLD}{'PIPELINE COMPLETE':^{w}}{r}")
-        print(f"  {C.BR_GREEN}{C.BOLD}{'═' * w}{r}")
-        print()
-        print(f"    {C.BR_WHITE}Jira : {jira_url}/browse/{jira_key}{r}")
-        print(f"    {C.BR_WHITE}PR   : https://github.com/{github_repo}/pull/{pr_number}{r}")
-        print(f"    {C.BR_YELLOW}Status: PR is open — NOT merged (manual merge required){r}")
-        print()
+        self._out("")
+        self._out(f"  {C.BR_GREEN_BOLD}{_RULE_DOUBLE}{r}")
+        self._out(f"  {C.BR_GREEN_BOLD}{_SUMMARY_TITLE}{r}")
+        self._out(f"  {C.BR_GREEN_BOLD}{_RULE_DOUBLE}{r}")
+        self._out("")
+        self._out(f"    {C.BR_WHITE}Jira : {jira_url}/browse/{jira_key}{r}")
+        self._out(f"    {C.BR_WHITE}PR   : https://github.com/{github_repo}/pull/{pr_number}{r}")
+        self._out(f"    {C.BR_YELLOW}Status: PR is open — NOT merged (manual merge required){r}")
+        self._out("")
         self._progress_bar(DONE, FIX in self.completed)
         self.show_architecture(DONE)
 
@@ -337,25 +533,45 @@ async def pretty_console(stream: Any, ui: PipelineUI) -> Any:
     Returns the TaskResult (same contract as autogen_agentchat.ui.Console).
     """
     from autogen_agentchat.base import TaskResult
+    from autogen_agentchat.messages import (
+        TextMessage,
+        ToolCallExecutionEvent,
+        ToolCallRequestEvent,
+        ToolCallSummaryMessage,
+    )
 
     result = None
     async for msg in stream:
-        if isinstance(msg, TaskResult):
+        # Branch once on the message class; each one has a fixed content shape
+        if isinstance(msg, ToolCallRequestEvent):
+            for call in msg.content:
+                brief = _summarize_args(call.name, _parse_args(call.arguments))
+                ui.tool_call(msg.source, call.id, call.name, brief)
+        elif isinstance(msg, ToolCallExecutionEvent):
+            for res in msg.content:
+                ui.tool_result(res.call_id, res.content)
+        elif isinstance(msg, (TextMessage, ToolCallSummaryMessage)):
+            if msg.content.strip():
+                ui.agent_message(msg.source, msg.content)
+        elif isinstance(msg, TaskResult):
             result = msg
-            continue
-
-        source  = getattr(msg, "source", "")
-        content = getattr(msg, "content", "")
-
-        if isinstance(content, str) and content.strip():
-            ui.agent_message(source, content)
-        elif isinstance(content, list):
-            for item in content:
-                if hasattr(item, "name") and hasattr(item, "arguments"):
-                    call_id = getattr(item, "id", "")
-                    brief   = _summarize_args(item.name, item.arguments)
-                    ui.tool_call(source, call_id, item.name, brief)
-                elif hasattr(item, "call_id") and hasattr(item, "content"):
-                    ui.tool_result(item.call_id, item.content)
+        elif isinstance(getattr(msg, "content", None), str) and msg.content.strip():
+            # ThoughtEvent, HandoffMessage, StopMessage, ...: anything else with text
+            ui.agent_message(msg.source, msg.content)
+
+    return result
+
 
+async def quiet_console(stream: Any, ui: PipelineUI) -> Any:
+    """Drain an AutoGen run_stream() without rendering each message.
+
+    Drop-in for pretty_console when stdout is not a terminal (CI, pipes),
+    where per-message formatting and writes are pure overhead.
+    """
+    from autogen_agentchat.base import TaskResult
+
+    result = None
+    async for msg in stream:
+        if isinstance(msg, TaskResult):
+            result = msg
     return result
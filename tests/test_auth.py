@@ -0,0 +1,80 @@
+import os
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import auth
+
+
+class WriteEnvTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.env_file = Path(tmp.name) / ".env"
+        self.cache_file = Path(tmp.name) / ".env.cache.json"
+        for name, path in (("ENV_FILE", self.env_file), ("_LEGACY_ENV_CACHE_FILE", self.cache_file)):
+            patcher = mock.patch.object(auth, name, path)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_quoted_value_with_comment_keeps_following_lines(self):
+        self.env_file.write_text(
+            'JIRA_URL="https://x.atlassian.net"  # my jira\n'
+            "JIRA_USER=old@example.com\n"
+            "GITHUB_REPO=owner/repo\n"
+            "OPENAI_API_KEY=sk-test\n"
+        )
+        auth.write_env({"JIRA_URL": "https://y.atlassian.net", "JIRA_USER": "me@example.com"})
+        self.assertEqual(
+            self.env_file.read_text(),
+            "JIRA_URL=https://y.atlassian.net\n"
+            "JIRA_USER=me@example.com\n"
+            "GITHUB_REPO=owner/repo\n"
+            "OPENAI_API_KEY=sk-test\n",
+        )
+
+    def test_multiline_value_is_replaced_whole(self):
+        self.env_file.write_text('# certs\nCERT="line1\nline2"\nGITHUB_REPO=owner/repo\n')
+        auth.write_env({"CERT": "x"})
+        self.assertEqual(self.env_file.read_text(), "# certs\nCERT=x\nGITHUB_REPO=owner/repo\n")
+
+    def test_unclosed_quote_keeps_following_lines(self):
+        self.env_file.write_text('JIRA_URL="https://x.atlassian.net\nGITHUB_REPO=owner/repo\n')
+        auth.write_env({"JIRA_URL": "https://y.atlassian.net"})
+        self.assertEqual(
+            self.env_file.read_text(), "JIRA_URL=https://y.atlassian.net\nGITHUB_REPO=owner/repo\n"
+        )
+
+    def test_read_env_round_trip_is_unchanged(self):
+        text = 'export JIRA_URL=https://x.atlassian.net\nOPENAI_API_KEY="sk-test"\nCERT="a\nb"\n'
+        self.env_file.write_text(text)
+        auth.write_env(auth.read_env())
+        self.assertEqual(self.env_file.read_text(), text)
+
+    def test_new_keys_are_appended_and_quoted(self):
+        self.env_file.write_text("GITHUB_REPO=owner/repo")
+        auth.write_env({"BASE_BRANCH": "dev branch"})
+        self.assertEqual(self.env_file.read_text(), "GITHUB_REPO=owner/repo\nBASE_BRANCH='dev branch'\n")
+
+    def test_legacy_cache_with_tokens_is_removed(self):
+        self.cache_file.write_text('{"stamp": [0, 0], "values": {"GITHUB_TOKEN": "old"}}')
+        auth.write_env({"GITHUB_TOKEN": "new"})
+        self.assertFalse(self.cache_file.exists())
+
+    @unittest.skipIf(os.name == "nt", "POSIX permissions")
+    def test_permissions_are_kept(self):
+        self.env_file.write_text("GITHUB_TOKEN=old\n")
+        self.env_file.chmod(0o600)
+        auth.write_env({"GITHUB_TOKEN": "new"})
+        self.assertEqual(stat.S_IMODE(self.env_file.stat().st_mode), 0o600)
+
+    @unittest.skipIf(os.name == "nt", "POSIX permissions")
+    def test_new_file_is_private(self):
+        auth.write_env({"GITHUB_TOKEN": "new"})
+        self.assertEqual(stat.S_IMODE(self.env_file.stat().st_mode), 0o600)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,18 @@
+import asyncio
+
+from tools.github_tools import _get_repo
+from tools.jira_tools import _find_assignee_account_id, _get_jira
+
+
+async def prewarm_clients() -> None:
+    """Build the GitHub/Jira clients and resolve the assignee off the critical path.
+
+    Started as a background task when the pipeline starts, so the first tool
+    call of the PM and Developer agents finds everything already cached.
+    Failures are swallowed: the tools retry lazily and report errors themselves.
+    """
+    await asyncio.gather(
+        asyncio.to_thread(_get_repo),
+        asyncio.to_thread(lambda: _find_assignee_account_id(_get_jira())),
+        return_exceptions=True,
+    )
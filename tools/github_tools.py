@@ -1,19 +1,163 @@
-from github import Github, GithubException, Repository
-from config import config
+import asyncio
+import io
+import threading
+from collections import OrderedDict
+
+import requests
+from github import Github, GithubException, PullRequest, Repository
+from config import get_config
 
 _github_client: Github | None = None
 _repo: Repository.Repository | None = None
 _last_branch: str | None = None
 
+# Read caches for one pipeline run.  File/tree reads are keyed by (ref, path),
+# bounded LRU, and refreshed when create_or_update_file commits to that ref;
+# PR reads are keyed by (kind, pr_number, head_sha) so new commits naturally miss.
+_CACHE_SIZE = 128
+_file_cache: OrderedDict[tuple[str, str], str] = OrderedDict()
+_tree_cache: OrderedDict[tuple[str, str], str] = OrderedDict()
+_pr_cache: dict[tuple[str, int, str], str] = {}
+# Blob SHA of each (ref, path) seen by a read or write, so an update can skip
+# the get_contents probe and a new file goes straight to create_file.
+_sha_cache: dict[tuple[str, str], str] = {}
+# Loaded PullRequest objects, so the PR helpers of one review share a get_pull.
+# Dropped on any file commit (the head SHA they carry goes stale) and on reviews.
+_PULL_CACHE_SIZE = 4
+# Changed-file list of a PR at a head SHA, shared by get_pr_diff and get_pr_files
+_pr_files_cache: dict[tuple[int, str], list] = {}
+
+# Rule around each file header in get_pr_diff output
+_SEP = "=" * 60
+_pull_cache: OrderedDict[int, PullRequest.PullRequest] = OrderedDict()
+# Tools run in worker threads (asyncio.to_thread), so every cache access goes
+# through this lock; it is never held across a GitHub request.
+_cache_lock = threading.Lock()
+# File commits pushed by create_or_update_file in this process. The pipeline
+# compares it across a fix round: the PR's head.sha is updated asynchronously
+# by GitHub after a push and can still show the old commit.
+_commit_count = 0
+
+
+def reset_caches() -> None:
+    """Forget all cached GitHub reads. Called at the start of each pipeline run."""
+    with _cache_lock:
+        _file_cache.clear()
+        _tree_cache.clear()
+        _pr_cache.clear()
+        _pull_cache.clear()
+        _pr_files_cache.clear()
+        _sha_cache.clear()
+
+
+def _cache_get(cache: OrderedDict, key: tuple[str, str]) -> str | None:
+    with _cache_lock:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+
+def _lru_put(cache: OrderedDict, key: tuple[str, str], value: str) -> None:
+    # Caller holds _cache_lock
+    cache[key] = value
+    cache.move_to_end(key)
+    if len(cache) > _CACHE_SIZE:
+        cache.popitem(last=False)
+
+
+def _cache_put(cache: OrderedDict, key: tuple[str, str], value: str) -> None:
+    with _cache_lock:
+        _lru_put(cache, key, value)
+
+
+def _remember_write(key: tuple[str, str], sha: str, content: str) -> None:
+    """Record a committed blob and drop the loaded PRs whose head SHA it outdated."""
+    global _commit_count
+    with _cache_lock:
+        _commit_count += 1
+        _sha_cache[key] = sha
+        _lru_put(_file_cache, key, content)
+        _pull_cache.clear()
+
+
+def _pr_cached(key: tuple[str, int, str]) -> str | None:
+    with _cache_lock:
+        return _pr_cache.get(key)
+
+
+def _pr_store(key: tuple[str, int, str], value: str) -> str:
+    with _cache_lock:
+        _pr_cache[key] = value
+    return value
+
+
+def _invalidate_tree(branch: str) -> None:
+    """Drop every cached directory listing of a branch after a file is added."""
+    with _cache_lock:
+        for key in [k for k in _tree_cache if k[0] == branch]:
+            del _tree_cache[key]
+
+
+def _copy_branch_cache(src: str, dst: str) -> None:
+    """Seed a freshly created branch with the file reads/SHAs cached for its source.
+
+    Right after branching both refs point at the same commit, so every blob
+    is identical; the first write on the feature branch can then update
+    directly instead of probing for the SHA again.
+    """
+    with _cache_lock:
+        for (ref, path), sha in list(_sha_cache.items()):
+            if ref == src:
+                _sha_cache[(dst, path)] = sha
+        for (ref, path), text in list(_file_cache.items()):
+            if ref == src:
+                _lru_put(_file_cache, (dst, path), text)
+
+
+def invalidate_pr(pr_number: int) -> None:
+    """Forget the loaded PR and its cached reviews/comments after it is reviewed."""
+    with _cache_lock:
+        _pull_cache.pop(pr_number, None)
+        for key in [k for k in _pr_cache if k[1] == pr_number and k[0] in ("reviews", "comments")]:
+            del _pr_cache[key]
+
 
 def _get_repo() -> Repository.Repository:
     global _github_client, _repo
     if _repo is None:
-        _github_client = Github(config.GITHUB_TOKEN)
-        _repo = _github_client.get_repo(config.GITHUB_REPO)
+        cfg = get_config()
+        _github_client = Github(cfg.GITHUB_TOKEN)
+        _repo = _github_client.get_repo(cfg.GITHUB_REPO)
     return _repo
 
 
+def _pr_files(pr: PullRequest.PullRequest) -> list:
+    """Crawl a PR's paginated /files listing once per head SHA."""
+    key = (pr.number, pr.head.sha)
+    with _cache_lock:
+        files = _pr_files_cache.get(key)
+    if files is None:
+        files = list(pr.get_files())
+        with _cache_lock:
+            files = _pr_files_cache.setdefault(key, files)
+    return files
+
+
+def _get_pull(pr_number: int) -> PullRequest.PullRequest:
+    with _cache_lock:
+        pr = _pull_cache.get(pr_number)
+        if pr is not None:
+            _pull_cache.move_to_end(pr_number)
+            return pr
+    pr = _get_repo().get_pull(pr_number)
+    with _cache_lock:
+        _pull_cache[pr_number] = pr
+        if len(_pull_cache) > _PULL_CACHE_SIZE:
+            _pull_cache.popitem(last=False)
+    return pr
+
+
 def get_repo_tree(path: str = "") -> str:
     """Get the file and directory listing of the repository.
 
@@ -24,16 +168,30 @@ def get_repo_tree(path: str = "") -> str:
         Formatted list of files and directories.
     """
     try:
+        ref = _last_branch or get_config().BASE_BRANCH
+        cached = _cache_get(_tree_cache, (ref, path))
+        if cached is not None:
+            return cached
         repo = _get_repo()
-        ref = _last_branch or config.BASE_BRANCH
         contents = repo.get_contents(path, ref=ref)
         if not isinstance(contents, list):
             contents = [contents]
-        result = []
-        for item in sorted(contents, key=lambda x: (x.type != "dir", x.path)):
-            marker = "[DIR] " if item.type == "dir" else "[FILE]"
-            result.append(f"{marker} {item.path}")
-        return "\n".join(result) if result else "Empty directory"
+        # Decorate once instead of calling a key lambda per item: "[DIR]" sorts
+        # before "[FILE]", so (prefix, path) is both the sort key and the output
+        keyed = [
+            ("[DIR]  " if item.type == "dir" else "[FILE] ", item.path)
+            for item in contents
+        ]
+        keyed.sort()
+        buf = io.StringIO()
+        for prefix, item_path in keyed:
+            if buf.tell():
+                buf.write("\n")
+            buf.write(prefix)
+            buf.write(item_path)
+        listing = buf.getvalue() or "Empty directory"
+        _cache_put(_tree_cache, (ref, path), listing)
+        return listing
     except Exception as e:
         return f"Error listing repository: {e}"
 
@@ -49,12 +207,19 @@ def get_file_content(file_path: str, branch: str = "") -> str:
         The file content as a string.
     """
     try:
+        ref = branch or _last_branch or get_config().BASE_BRANCH
+        cached = _cache_get(_file_cache, (ref, file_path))
+        if cached is not None:
+            return cached
         repo = _get_repo()
-        ref = branch or _last_branch or config.BASE_BRANCH
         content = repo.get_contents(file_path, ref=ref)
         if isinstance(content, list):
             return f"Error: {file_path} is a directory, not a file"
-        return content.decoded_content.decode("utf-8")
+        text = content.decoded_content.decode("utf-8")
+        with _cache_lock:
+            _lru_put(_file_cache, (ref, file_path), text)
+            _sha_cache[(ref, file_path)] = content.sha
+        return text
     except Exception as e:
         return f"Error reading file: {e}"
 
@@ -71,13 +236,15 @@ def create_branch(branch_name: str) -> str:
     global _last_branch
     try:
         repo = _get_repo()
-        base = repo.get_branch(config.BASE_BRANCH)
+        base_branch = get_config().BASE_BRANCH
+        base = repo.get_branch(base_branch)
         repo.create_git_ref(
             ref=f"refs/heads/{branch_name}",
             sha=base.commit.sha,
         )
         _last_branch = branch_name
-        return f"Created branch: {branch_name} (from {config.BASE_BRANCH})"
+        _copy_branch_cache(base_branch, branch_name)
+        return f"Created branch: {branch_name} (from {base_branch})"
     except GithubException as e:
         if e.status == 422:
             _last_branch = branch_name
@@ -102,32 +269,67 @@ def create_or_update_file(
         Confirmation message with commit details.
     """
     if not branch:
-        branch = _last_branch or config.BASE_BRANCH
+        branch = _last_branch or get_config().BASE_BRANCH
     if not commit_message:
         commit_message = f"Update {file_path}"
+    key = (branch, file_path)
     try:
         repo = _get_repo()
-        try:
-            existing = repo.get_contents(file_path, ref=branch)
-            if isinstance(existing, list):
-                return f"Error: {file_path} is a directory"
-            result = repo.update_file(
-                path=file_path,
-                message=commit_message,
-                content=content,
-                sha=existing.sha,
-                branch=branch,
-            )
-            return f"Updated {file_path} on {branch} (commit: {result['commit'].sha[:8]})"
-        except GithubException:
-            result = repo.create_file(
-                path=file_path,
-                message=commit_message,
-                content=content,
-                branch=branch,
-            )
-            return f"Created {file_path} on {branch} (commit: {result['commit'].sha[:8]})"
+        with _cache_lock:
+            sha = _sha_cache.get(key)
+        create_error: GithubException | None = None
+        if sha is None:
+            # Optimistic create: one request for a new file. GitHub answers an
+            # existing path with 422 "sha wasn't supplied"; other 422s are real errors.
+            try:
+                result = repo.create_file(
+                    path=file_path,
+                    message=commit_message,
+                    content=content,
+                    branch=branch,
+                )
+            except GithubException as ge:
+                message = ge.data.get("message", "") if isinstance(ge.data, dict) else ""
+                if ge.status != 422 or "sha" not in message.lower():
+                    raise
+                create_error = ge
+            else:
+                _remember_write(key, result["content"].sha, content)
+                # A new file changes the directory listings on this branch
+                _invalidate_tree(branch)
+                return f"Created {file_path} on {branch} (commit: {result['commit'].sha[:8]})"
+
+        for attempt in range(2):
+            if sha is None:
+                try:
+                    existing = repo.get_contents(file_path, ref=branch)
+                except GithubException as ge:
+                    # Nothing there after all: report why the create failed instead
+                    if ge.status == 404 and create_error is not None:
+                        raise create_error from None
+                    raise
+                if isinstance(existing, list):
+                    return f"Error: {file_path} is a directory"
+                sha = existing.sha
+            try:
+                result = repo.update_file(
+                    path=file_path,
+                    message=commit_message,
+                    content=content,
+                    sha=sha,
+                    branch=branch,
+                )
+                break
+            except GithubException as ge:
+                # 409: the cached SHA is stale (the file moved on); re-read it once
+                if ge.status != 409 or attempt:
+                    raise
+                sha = None
+        _remember_write(key, result["content"].sha, content)
+        return f"Updated {file_path} on {branch} (commit: {result['commit'].sha[:8]})"
     except Exception as e:
+        with _cache_lock:
+            _sha_cache.pop(key, None)
         return f"Error writing file: {e}"
 
 
@@ -143,14 +345,14 @@ def create_pull_request(title: str, body: str, head_branch: str = "") -> str:
         The PR number and URL.
     """
     if not head_branch:
-        head_branch = _last_branch or config.BASE_BRANCH
+        head_branch = _last_branch or get_config().BASE_BRANCH
     try:
         repo = _get_repo()
         pr = repo.create_pull(
             title=title,
             body=body,
             head=head_branch,
-            base=config.BASE_BRANCH,
+            base=get_config().BASE_BRANCH,
         )
         return f"Created PR #{pr.number}: {pr.title}\nURL: {pr.html_url}"
     except Exception as e:
@@ -167,26 +369,31 @@ def get_pr_diff(pr_number: int) -> str:
         Formatted diff showing all file changes.
     """
     try:
-        repo = _get_repo()
-        pr = repo.get_pull(pr_number)
-        files = pr.get_files()
-        diff_parts = []
-        for f in files:
-            diff_parts.append(f"{'=' * 60}")
-            diff_parts.append(
-                f"File: {f.filename} | Status: {f.status} | +{f.additions} -{f.deletions}"
-            )
-            diff_parts.append(f"{'=' * 60}")
-            if f.patch:
-                diff_parts.append(f.patch)
-            else:
-                diff_parts.append("(binary file or no patch available)")
-            diff_parts.append("")
-        return "\n".join(diff_parts) if diff_parts else "No file changes in this PR"
+        return _pr_diff(_get_pull(pr_number))
     except Exception as e:
         return f"Error getting PR diff: {e}"
 
 
+def _pr_diff(pr) -> str:
+    """Format the diff of an already-loaded PullRequest (cached by head SHA)."""
+    key = ("diff", pr.number, pr.head.sha)
+    cached = _pr_cached(key)
+    if cached is not None:
+        return cached
+    buf = io.StringIO()
+    for f in _pr_files(pr):
+        if buf.tell():
+            buf.write("\n")
+        buf.write(
+            f"{_SEP}\n"
+            f"File: {f.filename} | Status: {f.status} | +{f.additions} -{f.deletions}\n"
+            f"{_SEP}\n"
+        )
+        buf.write(f.patch or "(binary file or no patch available)")
+        buf.write("\n")
+    return _pr_store(key, buf.getvalue() or "No file changes in this PR")
+
+
 def get_pr_files(pr_number: int) -> str:
     """Get the list of files changed in a pull request.
 
@@ -197,13 +404,17 @@ def get_pr_files(pr_number: int) -> str:
         List of changed files with their status and change counts.
     """
     try:
-        repo = _get_repo()
-        pr = repo.get_pull(pr_number)
-        files = pr.get_files()
-        result = []
-        for f in files:
-            result.append(f"{f.status}: {f.filename} (+{f.additions} -{f.deletions})")
-        return "\n".join(result) if result else "No files changed"
+        pr = _get_pull(pr_number)
+        key = ("files", pr_number, pr.head.sha)
+        cached = _pr_cached(key)
+        if cached is not None:
+            return cached
+        buf = io.StringIO()
+        for f in _pr_files(pr):
+            if buf.tell():
+                buf.write("\n")
+            buf.write(f"{f.status}: {f.filename} (+{f.additions} -{f.deletions})")
+        return _pr_store(key, buf.getvalue() or "No files changed")
     except Exception as e:
         return f"Error getting PR files: {e}"
 
@@ -218,18 +429,20 @@ def get_pr_reviews(pr_number: int) -> str:
         Formatted list of reviews with reviewer, state, and body.
     """
     try:
-        repo = _get_repo()
-        pr = repo.get_pull(pr_number)
+        pr = _get_pull(pr_number)
+        key = ("reviews", pr_number, pr.head.sha)
+        cached = _pr_cached(key)
+        if cached is not None:
+            return cached
         reviews = list(pr.get_reviews())
         if not reviews:
             return "No reviews on this PR yet."
-        result = []
+        buf = io.StringIO()
         for r in reviews:
-            result.append(f"Reviewer: {r.user.login}")
-            result.append(f"State: {r.state}")
-            result.append(f"Body: {r.body}")
-            result.append("---")
-        return "\n".join(result)
+            if buf.tell():
+                buf.write("\n")
+            buf.write(f"Reviewer: {r.user.login}\nState: {r.state}\nBody: {r.body}\n---")
+        return _pr_store(key, buf.getvalue())
     except Exception as e:
         return f"Error getting PR reviews: {e}"
 
@@ -244,23 +457,105 @@ def get_pr_review_comments(pr_number: int) -> str:
         Formatted list of inline comments with file, line, and body.
     """
     try:
-        repo = _get_repo()
-        pr = repo.get_pull(pr_number)
+        pr = _get_pull(pr_number)
+        key = ("comments", pr_number, pr.head.sha)
+        cached = _pr_cached(key)
+        if cached is not None:
+            return cached
         comments = list(pr.get_review_comments())
         if not comments:
             return "No inline review comments on this PR."
-        result = []
+        buf = io.StringIO()
         for c in comments:
-            result.append(f"File: {c.path}")
-            result.append(f"Line: {c.position}")
-            result.append(f"Author: {c.user.login}")
-            result.append(f"Body: {c.body}")
-            result.append("---")
-        return "\n".join(result)
+            if buf.tell():
+                buf.write("\n")
+            buf.write(
+                f"File: {c.path}\nLine: {c.position}\nAuthor: {c.user.login}\nBody: {c.body}\n---"
+            )
+        return _pr_store(key, buf.getvalue())
     except Exception as e:
         return f"Error getting review comments: {e}"
 
 
+def commit_count() -> int:
+    """Return how many file commits create_or_update_file has pushed so far.
+
+    Used by the pipeline (not exposed as an agent tool) to tell whether a fix
+    round actually pushed anything before paying for another review.
+    """
+    with _cache_lock:
+        return _commit_count
+
+
+_PR_CONTEXT_QUERY = """\
+query($owner: String!, $name: String!, $number: Int!) {
+  repository(owner: $owner, name: $name) {
+    pullRequest(number: $number) {
+      files(first: 100) { nodes { path additions deletions changeType } }
+      reviews(last: 20) { nodes { author { login } state body } }
+      reviewThreads(last: 50) {
+        nodes { comments(first: 20) { nodes { path line author { login } body } } }
+      }
+    }
+  }
+}
+"""
+
+
+def prefetch_pr_context(pr_number: int) -> str:
+    """Fetch changed files, reviews and inline comments of a PR in one GraphQL call.
+
+    Used by the pipeline to hand the architect its review context up front,
+    instead of the agent issuing a separate REST tool call for each part.
+    The diff itself is not available over GraphQL; see get_pr_diff.
+    """
+    try:
+        cfg = get_config()
+        owner, name = cfg.GITHUB_REPO.split("/", 1)
+        r = requests.post(
+            "https://api.github.com/graphql",
+            json={
+                "query": _PR_CONTEXT_QUERY,
+                "variables": {"owner": owner, "name": name, "number": pr_number},
+            },
+            headers={"Authorization": f"Bearer {cfg.GITHUB_TOKEN}"},
+            timeout=30,
+        )
+        r.raise_for_status()
+        payload = r.json()
+        if payload.get("errors"):
+            raise RuntimeError(payload["errors"][0].get("message", "GraphQL error"))
+        pr = payload["data"]["repository"]["pullRequest"]
+
+        result = ["Changed files:"]
+        for f in pr["files"]["nodes"]:
+            result.append(
+                f"{f['changeType'].lower()}: {f['path']} (+{f['additions']} -{f['deletions']})"
+            )
+        reviews = pr["reviews"]["nodes"]
+        if reviews:
+            result.append("")
+            result.append("Previous reviews:")
+            for rv in reviews:
+                result.append(f"Reviewer: {(rv['author'] or {}).get('login', '?')}")
+                result.append(f"State: {rv['state']}")
+                result.append(f"Body: {rv['body']}")
+                result.append("---")
+        comments = [c for t in pr["reviewThreads"]["nodes"] for c in t["comments"]["nodes"]]
+        if comments:
+            result.append("")
+            result.append("Inline review comments:")
+            for c in comments:
+                result.append(f"File: {c['path']}")
+                result.append(f"Line: {c['line']}")
+                result.append(f"Author: {(c['author'] or {}).get('login', '?')}")
+                result.append(f"Body: {c['body']}")
+                result.append("---")
+        return "\n".join(result)
+    except Exception as e:
+        return f"Error prefetching PR context: {e}"
+
+
 def add_pr_review(pr_number: int, body: str, event: str = "COMMENT") -> str:
     """Add a review to a pull request.
 
@@ -273,18 +568,20 @@ def add_pr_review(pr_number: int, body: str, event: str = "COMMENT") -> str:
         Confirmation message.
     """
     try:
-        repo = _get_repo()
-        pr = repo.get_pull(pr_number)
+        pr = _get_pull(pr_number)
         try:
             pr.create_review(body=body, event=event)
-            return f"Added {event} review to PR #{pr_number}"
+            result = f"Added {event} review to PR #{pr_number}"
         except GithubException as ge:
-            if event == "APPROVE" and ge.status == 422:
-                if "APPROVED" not in body.upper():
-                    body += "\n\nAPPROVED"
-                pr.create_review(body=body, event="COMMENT")
-                return f"Self-approval blocked by GitHub. Added COMMENT review with APPROVED to PR #{pr_number}"
-            raise
+            if event != "APPROVE" or ge.status != 422:
+                raise
+            if "APPROVED" not in body.upper():
+                body += "\n\nAPPROVED"
+            pr.create_review(body=body, event="COMMENT")
+            result = f"Self-approval blocked by GitHub. Added COMMENT review with APPROVED to PR #{pr_number}"
+        # Only once the review exists: a read racing the request would re-cache the old list
+        invalidate_pr(pr_number)
+        return result
     except Exception as e:
         return f"Error adding review: {e}"
 
@@ -302,17 +599,32 @@ def approve_pull_request(
         Confirmation message.
     """
     try:
-        repo = _get_repo()
-        pr = repo.get_pull(pr_number)
+        pr = _get_pull(pr_number)
         try:
             pr.create_review(body=body, event="APPROVE")
-            return f"Approved PR #{pr_number}"
+            result = f"Approved PR #{pr_number}"
         except GithubException as ge:
-            if ge.status == 422:
-                if "APPROVED" not in body.upper():
-                    body += "\n\nAPPROVED"
-                pr.create_review(body=body, event="COMMENT")
-                return f"Self-approval blocked by GitHub. Added COMMENT review with APPROVED to PR #{pr_number}"
-            raise
+            if ge.status != 422:
+                raise
+            if "APPROVED" not in body.upper():
+                body += "\n\nAPPROVED"
+            pr.create_review(body=body, event="COMMENT")
+            result = f"Self-approval blocked by GitHub. Added COMMENT review with APPROVED to PR #{pr_number}"
+        # Only once the review exists: a read racing the request would re-cache the old list
+        invalidate_pr(pr_number)
+        return result
     except Exception as e:
         return f"Error approving PR: {e}"
+
+
+async def fetch_pr_bundle(pr_number: int) -> dict[str, str]:
+    """Fetch everything the architect review starts from, concurrently.
+
+    The REST diff and the GraphQL files/reviews/comments query run in parallel.
+    Returns "diff" and "context".
+    """
+    diff, context = await asyncio.gather(
+        asyncio.to_thread(get_pr_diff, pr_number),
+        asyncio.to_thread(prefetch_pr_context, pr_number),
+    )
+    return {"diff": diff, "context": context}
@@ -1,26 +1,33 @@
 import json
 from atlassian import Jira
-from config import config
+from config import get_config
 
 _jira_client: Jira | None = None
+# Account ID of the configured user; only set once a lookup succeeds
+_assignee_account_id: str | None = None
 
 
 def _get_jira() -> Jira:
     global _jira_client
     if _jira_client is None:
+        cfg = get_config()
         _jira_client = Jira(
-            url=config.JIRA_URL,
-            username=config.JIRA_USER,
-            password=config.JIRA_API_TOKEN,
+            url=cfg.JIRA_URL,
+            username=cfg.JIRA_USER,
+            password=cfg.JIRA_API_TOKEN,
         )
     return _jira_client
 
 
 def _find_assignee_account_id(jira: Jira) -> str | None:
     """Look up the Jira account ID for the configured user."""
+    global _assignee_account_id
+    if _assignee_account_id is not None:
+        return _assignee_account_id
     try:
         me = jira.myself()
-        return me.get("accountId")
+        _assignee_account_id = me.get("accountId")
+        return _assignee_account_id
     except Exception:
         pass
     return None
@@ -44,13 +51,14 @@ def create_jira_issue(
         The created issue key and URL, or an error message.
     """
     try:
+        cfg = get_config()
         jira = _get_jira()
         full_description = description
         if acceptance_criteria:
             full_description += f"\n\n*Acceptance Criteria:*\n{acceptance_criteria}"
 
         fields: dict = {
-            "project": {"key": config.JIRA_PROJECT_KEY},
+            "project": {"key": cfg.JIRA_PROJECT_KEY},
             "summary": summary,
             "description": full_description,
             "issuetype": {"name": issue_type},
@@ -62,10 +70,10 @@ def create_jira_issue(
 
         result = jira.issue_create(fields=fields)
         issue_key = result["key"]
-        assigned = config.JIRA_USER if account_id else "could not assign"
+        assigned = cfg.JIRA_USER if account_id else "could not assign"
         return (
             f"Created Jira issue: {issue_key}\n"
-            f"URL: {config.JIRA_URL}/browse/{issue_key}\n"
+            f"URL: {cfg.JIRA_URL}/browse/{issue_key}\n"
             f"Assigned to: {assigned}"
         )
     except Exception as e: